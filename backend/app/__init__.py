@@ -12,6 +12,9 @@ if os.environ.get('FLASK_ENV') == 'development':
 app = Flask(__name__)
 app.config.from_object('app.config.Config')
 
+from app.utils.logger import setup_logger
+setup_logger(app.config['LOG_LEVEL'], app.config['LOG_FORMAT'])
+
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 cred_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
@@ -23,7 +26,12 @@ else:
 
 db = firestore.client()
 
-socketio = SocketIO(app, cors_allowed_origins="*")
+from app.utils.serialization import OrjsonModule
+
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+                    json=OrjsonModule,
+                    serializer='msgpack')
 
 from app.routes import init_routes
 init_routes(app)
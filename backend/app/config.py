@@ -30,6 +30,9 @@ class Config:
     # SocketIO settings
     SOCKETIO_CORS_ALLOWED_ORIGINS = CORS_ORIGINS
     SOCKETIO_ASYNC_MODE = 'eventlet'
+    # Redis URL shared by every worker for SocketIO broadcasts and presence;
+    # unset keeps both in-process (single worker)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('REDIS_URL')
     
     # Draft settings
     DEFAULT_PICK_TIME_SECONDS = 120  # 2 minutes per pick
@@ -44,9 +47,13 @@ class Config:
     
     # Cache settings
     PLAYER_DATA_CACHE_HOURS = 6
+    # Redis URL for the FPL response cache shared by every worker;
+    # unset keeps the cache per-process
+    FPL_CACHE_REDIS_URL = os.environ.get('REDIS_URL')
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # 'text' or 'json'
     
     @staticmethod
     def get_firebase_config() -> Dict[str, Any]:
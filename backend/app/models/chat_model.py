@@ -58,6 +58,49 @@ class ChatModel:
             logger.error(f"Error creating league message: {str(e)}")
             raise
 
+    def send_waiver_summary(self, league_id: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Post a single league chat message summarizing a waiver run.
+        
+        Args:
+            league_id: League identifier
+            results: Processed claims, each with team_name, player_name, bid_amount and status
+            
+        Returns:
+            Created message document
+        """
+        try:
+            successful = [r for r in results if r['status'] == 'successful']
+            lines = [f"{r['team_name']} claimed {r['player_name']} for {r['bid_amount']}"
+                     for r in successful]
+            summary = (f"Waivers processed: {len(successful)} of {len(results)} claims successful"
+                       + ''.join(f"\n{line}" for line in lines))
+            
+            message_data = {
+                'league_id': league_id,
+                'user_id': 'system',
+                'username': 'System',
+                'message': summary,
+                'message_type': 'waiver',
+                'timestamp': datetime.utcnow(),
+                'edited': False,
+                'edited_at': None,
+                'reactions': {},
+                'waiver_results': results
+            }
+            
+            doc_ref = self.db.collection('leagues').document(league_id)\
+                        .collection('chat').document()
+            doc_ref.set(message_data)
+            
+            message_data['id'] = doc_ref.id
+            logger.info(f"Posted waiver summary in {league_id} for {len(results)} claims")
+            return message_data
+            
+        except Exception as e:
+            logger.error(f"Error posting waiver summary: {str(e)}")
+            raise
+
     def get_league_messages(self, league_id: str, limit: int = 50, 
                           last_message_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 import uuid
 import random
 import string
+from firebase_admin import firestore
 from .. import get_db, get_socketio
 from ..utils.logger import get_logger
 
@@ -91,6 +92,7 @@ class LeagueModel:
                 },
                 'matchup_schedule': [],
                 'playoff_bracket': {},
+                'waiver_order': [],  # team IDs, highest waiver priority first
                 'waiver_settings': {
                     'budget_per_team': settings['waiver_budget'],
                     'process_day': settings['waiver_process_day'],
@@ -184,9 +186,10 @@ class LeagueModel:
             if not team_result['success']:
                 return team_result
             
-            # Update league teams count
+            # Update league teams count and put the new team last in waiver order
             self.update_league(league_id, {
                 'teams_count': league['teams_count'] + 1,
+                'waiver_order': firestore.ArrayUnion([team_result['team_id']]),
                 'updated_at': datetime.utcnow()
             })
             
@@ -19,7 +19,7 @@ class TradeModel:
     def propose_trade(self, league_id: str, proposer_team_id: str, receiver_team_id: str, 
                      proposer_players: List[int], receiver_players: List[int], 
                      proposer_picks: List[Dict] = None, receiver_picks: List[Dict] = None,
-                     expiration_days: int = 3) -> Dict[str, Any]:
+                     expiration_days: int = 3, team_details: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Propose a new trade.
         
@@ -32,6 +32,9 @@ class TradeModel:
             proposer_picks: Optional draft picks from proposer
             receiver_picks: Optional draft picks from receiver
             expiration_days: Days until trade expires
+            team_details: Optional denormalized team names and owner IDs
+                (proposer_team_name, proposer_owner_id, receiver_team_name,
+                receiver_owner_id) stored on the trade for notifications
             
         Returns:
             Dict with trade_id and success status
@@ -73,19 +76,19 @@ class TradeModel:
                 'notes': ''
             }
             
+            # Denormalize team details so follow-up actions don't need team reads
+            if team_details:
+                trade_data.update(team_details)
+            
             # Store in Firestore
             doc_ref = (self.db.collection('leagues').document(league_id)
                       .collection('trades').document(trade_id))
             doc_ref.set(trade_data)
             
-            # Send real-time notification
+            # Send real-time notification (ids only; clients fetch trade details on demand)
             self.socketio.emit('trade_proposed', {
                 'league_id': league_id,
-                'trade_id': trade_id,
-                'proposer_team_id': proposer_team_id,
-                'receiver_team_id': receiver_team_id,
-                'proposer_players': proposer_players,
-                'receiver_players': receiver_players
+                'trade_id': trade_id
             }, room=f'league_{league_id}')
             
             logger.info(f"Trade {trade_id} proposed between teams {proposer_team_id} and {receiver_team_id}")
@@ -151,7 +154,8 @@ class TradeModel:
             
             return {
                 'success': True,
-                'message': 'Trade accepted successfully'
+                'message': 'Trade accepted successfully',
+                'trade': trade
             }
             
         except Exception as e:
@@ -203,7 +207,8 @@ class TradeModel:
             
             return {
                 'success': True,
-                'message': 'Trade rejected successfully'
+                'message': 'Trade rejected successfully',
+                'trade': trade
             }
             
         except Exception as e:
@@ -255,7 +260,8 @@ class TradeModel:
             
             return {
                 'success': True,
-                'message': 'Trade cancelled successfully'
+                'message': 'Trade cancelled successfully',
+                'trade': trade
             }
             
         except Exception as e:
@@ -277,20 +283,25 @@ class TradeModel:
             logger.error(f"Error getting trade {trade_id}: {e}")
             return None
     
-    def get_active_trades(self, league_id: str, team_id: str = None) -> List[Dict[str, Any]]:
+    def get_active_trades(self, league_id: str, team_id: str = None,
+                         limit: int = 500) -> List[Dict[str, Any]]:
         """
         Get active (pending) trades for a league or team.
         
         Args:
             league_id: League ID
             team_id: Optional team ID to filter by
+            limit: Maximum number of trades to read
             
         Returns:
             List of active trade dictionaries
         """
         try:
             trades_ref = (self.db.collection('leagues').document(league_id)
-                         .collection('trades').where('status', '==', 'pending'))
+                         .collection('trades')
+                         .where('status', '==', 'pending')
+                         .order_by('proposed_at', direction='DESCENDING')
+                         .limit(limit))
             
             trades = []
             for doc in trades_ref.stream():
@@ -352,6 +363,35 @@ class TradeModel:
             logger.error(f"Error getting trade history for league {league_id}: {e}")
             return []
     
+    def count_trades(self, league_id: str, status: str = None) -> int:
+        """Count trades in a league server-side, optionally filtered by status."""
+        try:
+            trades_ref = (self.db.collection('leagues').document(league_id)
+                         .collection('trades'))
+            if status:
+                trades_ref = trades_ref.where('status', '==', status)
+            
+            results = trades_ref.count().get()
+            return int(results[0][0].value)
+            
+        except Exception as e:
+            logger.error(f"Error counting trades for league {league_id}: {e}")
+            return 0
+    
+    def get_trade_proposers(self, league_id: str, limit: int = 1000) -> List[str]:
+        """Get the proposer team ID of recent trades, fetching only that field."""
+        try:
+            trades_ref = (self.db.collection('leagues').document(league_id)
+                         .collection('trades')
+                         .select(['proposer_team_id'])
+                         .limit(limit))
+            
+            return [doc.get('proposer_team_id') for doc in trades_ref.stream()]
+            
+        except Exception as e:
+            logger.error(f"Error getting trade proposers for league {league_id}: {e}")
+            return []
+    
     def get_team_trading_block(self, league_id: str, team_id: str) -> List[Dict[str, Any]]:
         """Get players that a team has put on the trading block."""
         try:
@@ -382,12 +422,11 @@ class TradeModel:
                 'trading_block_updated_at': datetime.utcnow()
             })
             
-            # Broadcast update
+            # Broadcast update to clients that opted into trading block updates
             self.socketio.emit('trading_block_updated', {
                 'league_id': league_id,
-                'team_id': team_id,
-                'player_ids': player_ids
-            }, room=f'league_{league_id}')
+                'team_id': team_id
+            }, room=f'league_{league_id}:blocks')
             
             return {'success': True, 'message': 'Trading block updated'}
             
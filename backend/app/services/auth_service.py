@@ -1,20 +1,56 @@
 """
 Authentication service for Firebase Auth integration.
 """
+import os
 from typing import Dict, Optional, Any
 from functools import wraps
 from flask import request, jsonify, g
 import firebase_admin
+import jwt
 from firebase_admin import auth
+from ..config import Config
 from ..utils.logger import get_logger
 
 logger = get_logger('auth_service')
 
+# Public keys Firebase signs ID tokens with, cached between rotations
+FIREBASE_JWKS_URL = 'https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com'
+JWKS_CACHE_SECONDS = 6 * 60 * 60
+
 class AuthService:
     """Service for handling Firebase Authentication."""
     
     def __init__(self):
         self.auth = auth
+        self._project_id = Config.FIREBASE_PROJECT_ID
+        self._jwks_client = jwt.PyJWKClient(FIREBASE_JWKS_URL, cache_keys=True,
+                                            lifespan=JWKS_CACHE_SECONDS)
+    
+    def _verify_token_locally(self, id_token: str) -> Dict[str, Any]:
+        """
+        Verify a Firebase ID token against the cached signing keys.
+        
+        The key set is only refetched when it expires or the token's kid is
+        unknown (key rotation), so most verifications are CPU-only.
+        
+        Raises:
+            jwt.PyJWKClientError: If the signing keys could not be fetched
+            jwt.InvalidTokenError: If the token is invalid
+        """
+        signing_key = self._jwks_client.get_signing_key_from_jwt(id_token)
+        claims = jwt.decode(
+            id_token,
+            signing_key.key,
+            algorithms=['RS256'],
+            audience=self._project_id,
+            issuer=f'https://securetoken.google.com/{self._project_id}'
+        )
+        if not claims.get('sub'):
+            raise jwt.InvalidTokenError('Token has no subject')
+        
+        # Match the shape firebase_admin returns
+        claims['uid'] = claims['sub']
+        return claims
     
     def verify_token(self, id_token: str) -> Optional[Dict[str, Any]]:
         """
@@ -26,6 +62,16 @@ class AuthService:
         Returns:
             User claims dict or None if invalid
         """
+        # Emulator tokens are unsigned, so only firebase_admin can check them
+        if not os.environ.get('FIREBASE_AUTH_EMULATOR_HOST'):
+            try:
+                return self._verify_token_locally(id_token)
+            except jwt.PyJWKClientError as e:
+                logger.warning(f"Signing keys unavailable, verifying through Firebase: {e}")
+            except jwt.InvalidTokenError as e:
+                logger.error(f"Token verification failed: {e}")
+                return None
+        
         try:
             # Verify the token
             decoded_token = self.auth.verify_id_token(id_token)
@@ -138,6 +138,10 @@ class NotificationService:
 
     async def _send_realtime_notification(self, user_id: str, notification_data: Dict[str, Any]) -> None:
         """Send real-time notification via SocketIO."""
+        self._emit_realtime_notification(user_id, notification_data)
+
+    def _emit_realtime_notification(self, user_id: str, notification_data: Dict[str, Any]) -> None:
+        """Emit a stored notification to the user's (and league's) SocketIO room."""
         try:
             if self.socketio:
                 # Prepare data for real-time emission
@@ -170,20 +174,24 @@ class NotificationService:
             logger.info(f"Email notification queued for user {user_id}: {notification_data['title']}")
             
             # Store email notification task for later processing
-            email_task = {
-                'user_id': user_id,
-                'notification_data': notification_data,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'status': 'queued',
-                'attempts': 0,
-                'max_attempts': 3
-            }
-            
-            self.db.collection('email_queue').document().set(email_task)
+            self.db.collection('email_queue').document().set(
+                self._build_email_task(user_id, notification_data)
+            )
             
         except Exception as e:
             logger.error(f"Error queueing email notification: {str(e)}")
 
+    def _build_email_task(self, user_id: str, notification_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an email queue document for a notification."""
+        return {
+            'user_id': user_id,
+            'notification_data': notification_data,
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'status': 'queued',
+            'attempts': 0,
+            'max_attempts': 3
+        }
+
     async def _get_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """Get user notification preferences."""
         try:
@@ -677,25 +685,22 @@ class NotificationService:
             team_model = TeamModel()
             teams = team_model.get_league_teams(league_id)
             
-            notification_ids = []
             exclude_user_ids = exclude_user_ids or []
             
-            for team in teams:
-                owner_id = team.get('owner_id')
-                if owner_id and owner_id not in exclude_user_ids:
-                    try:
-                        notification_id = await self.send_notification(
-                            owner_id,
-                            notification_type,
-                            title,
-                            message,
-                            data,
-                            NotificationPriority.MEDIUM,
-                            league_id
-                        )
-                        notification_ids.append(notification_id)
-                    except Exception as e:
-                        logger.error(f"Error sending notification to user {owner_id}: {str(e)}")
+            # One batched send for the whole league instead of a round-trip per member
+            notification_ids = self.send_bulk_notifications([
+                {
+                    'user_id': team['owner_id'],
+                    'notification_type': notification_type,
+                    'title': title,
+                    'message': message,
+                    'data': data,
+                    'priority': NotificationPriority.MEDIUM,
+                    'league_id': league_id
+                }
+                for team in teams
+                if team.get('owner_id') and team['owner_id'] not in exclude_user_ids
+            ])
             
             logger.info(f"Broadcast {len(notification_ids)} notifications to league {league_id}")
             return notification_ids
@@ -704,6 +709,103 @@ class NotificationService:
             logger.error(f"Error broadcasting league notification: {str(e)}")
             return []
 
+    def send_bulk_notifications(self, payloads: List[Dict[str, Any]]) -> List[str]:
+        """
+        Send many notifications using batched Firestore reads and writes.
+        
+        Preferences for every recipient are loaded with a single get_all call and
+        the notification (and email queue) documents are written in batches of up
+        to 500, so background jobs pay a handful of round-trips instead of several
+        per recipient.
+        
+        Args:
+            payloads: Notifications to send, each a dict with the send_notification
+                arguments: user_id, notification_type, title, message and
+                optionally data, priority and league_id
+            
+        Returns:
+            List of notification IDs
+        """
+        if not payloads:
+            return []
+        
+        try:
+            # Load all recipients' preferences in one round-trip
+            user_ids = list({payload['user_id'] for payload in payloads})
+            preference_refs = [self.db.collection('users').document(user_id)
+                               .collection('settings').document('notifications')
+                               for user_id in user_ids]
+            
+            preferences = {}
+            for doc in self.db.get_all(preference_refs):
+                if doc.exists:
+                    user_id = doc.reference.parent.parent.id
+                    preferences[user_id] = doc.to_dict().get('preferences', {})
+            
+            batch = self.db.batch()
+            batch_size = 0
+            notification_ids = []
+            realtime_notifications = []
+            
+            for payload in payloads:
+                user_id = payload['user_id']
+                notification_type = payload['notification_type']
+                priority = payload.get('priority', NotificationPriority.MEDIUM)
+                type_preferences = preferences.get(user_id, {}).get(
+                    notification_type.value,
+                    self.default_preferences.get(notification_type.value, {})
+                )
+                
+                notification_data = {
+                    'user_id': user_id,
+                    'type': notification_type.value,
+                    'title': payload['title'],
+                    'message': payload['message'],
+                    'data': payload.get('data') or {},
+                    'priority': priority.value,
+                    'league_id': payload.get('league_id'),
+                    'read': False,
+                    'created_at': firestore.SERVER_TIMESTAMP,
+                    'expires_at': datetime.utcnow() + timedelta(days=30)  # 30 day expiry
+                }
+                
+                doc_ref = (self.db.collection('users').document(user_id)
+                          .collection('notifications').document())
+                batch.set(doc_ref, notification_data)
+                batch_size += 1
+                
+                notification_data['id'] = doc_ref.id
+                notification_ids.append(doc_ref.id)
+                
+                if type_preferences.get('email', False):
+                    batch.set(self.db.collection('email_queue').document(),
+                              self._build_email_task(user_id, notification_data))
+                    batch_size += 1
+                
+                if type_preferences.get('push', True):
+                    realtime_notifications.append((user_id, notification_data))
+                
+                # Commit in batches of 500 (each payload writes at most 2 documents)
+                if batch_size >= 499:
+                    batch.commit()
+                    batch = self.db.batch()
+                    batch_size = 0
+            
+            # Commit remaining writes
+            if batch_size > 0:
+                batch.commit()
+            
+            # Emit real-time events only once the notifications are stored
+            for user_id, notification_data in realtime_notifications:
+                self._emit_realtime_notification(user_id, notification_data)
+            
+            logger.info(f"Sent {len(notification_ids)} bulk notifications to {len(user_ids)} users")
+            return notification_ids
+            
+        except Exception as e:
+            logger.error(f"Error sending bulk notifications: {str(e)}")
+            return []
+
     def cleanup_expired_notifications(self, days_old: int = 30) -> int:
         """
         Clean up expired notifications.
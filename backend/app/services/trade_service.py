@@ -3,11 +3,16 @@ Trade service for managing player trades between teams.
 Handles trade proposals, validation, execution, and trade blocks.
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 from enum import Enum
 from firebase_admin import firestore
+from flask import g, has_app_context
+from google.api_core.exceptions import GoogleAPIError
 
 from .. import get_db, get_socketio
 from ..models.trade_model import TradeModel
@@ -26,6 +31,40 @@ class TradeStatus(Enum):
     EXPIRED = "expired"
     COMPLETED = "completed"
 
+class TradeValidationError(Exception):
+    """Raised when a trade proposal breaks one of the league's trade rules."""
+
+def _as_utc(value: datetime) -> datetime:
+    """Return value as an aware UTC datetime, treating naive values as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+@lru_cache(maxsize=1024)
+def _parse_deadline(deadline: str) -> datetime:
+    """Parse an ISO trade deadline to aware UTC, memoized since leagues reuse the same value."""
+    return _as_utc(datetime.fromisoformat(deadline))
+
+def _deadline_utc(deadline: Any) -> datetime:
+    """
+    Normalise a stored trade deadline to an aware UTC datetime.
+    
+    Deadlines may be stored as ISO strings or come back from Firestore as
+    tz-aware timestamps; the stored setting itself is never modified.
+    """
+    if isinstance(deadline, str):
+        return _parse_deadline(deadline)
+    return _as_utc(deadline)
+
+def _roster_set(team: Dict[str, Any]) -> frozenset:
+    """Return a team's rostered player IDs as a frozenset, cached on the team dict."""
+    roster_set = team.get('_roster_set')
+    if roster_set is None:
+        roster = team.get('roster', {})
+        roster_set = frozenset(chain(roster.get('starters', ()), roster.get('bench', ())))
+        team['_roster_set'] = roster_set
+    return roster_set
+
 class TradeService:
     """Service for managing player trades between teams."""
     
@@ -38,6 +77,29 @@ class TradeService:
         self.league_model = LeagueModel()
         self.notification_service = NotificationService()
 
+    def _now(self) -> datetime:
+        """Return the current UTC time, cached on flask.g for the rest of the request."""
+        if not has_app_context():
+            return datetime.utcnow()
+        
+        now = getattr(g, '_trade_now', None)
+        if now is None:
+            now = datetime.utcnow()
+            g._trade_now = now
+        return now
+
+    def _get_league_teams(self, league_id: str) -> List[Dict[str, Any]]:
+        """Return the league's teams, memoized on flask.g for the rest of the request."""
+        if not has_app_context():
+            return self.team_model.get_league_teams(league_id)
+        
+        league_teams = getattr(g, '_trade_league_teams', None)
+        if league_teams is None:
+            league_teams = g._trade_league_teams = {}
+        if league_id not in league_teams:
+            league_teams[league_id] = self.team_model.get_league_teams(league_id)
+        return league_teams[league_id]
+
     def propose_trade(self, league_id: str, proposer_team_id: str, target_team_id: str,
                      proposer_players: List[int], target_players: List[int],
                      proposer_user_id: str, message: str = None) -> Dict[str, Any]:
@@ -56,6 +118,7 @@ class TradeService:
         Returns:
             Trade proposal result
         """
+        league_room = f"league_{league_id}"
         try:
             # Validate trade proposal
             validation_result = self._validate_trade_proposal(
@@ -75,36 +138,34 @@ class TradeService:
             # Use trade model to create the trade
             result = self.trade_model.propose_trade(
                 league_id, proposer_team_id, target_team_id,
-                proposer_players, target_players
+                proposer_players, target_players,
+                team_details={
+                    'proposer_team_name': proposer_team.get('name', 'Unknown Team'),
+                    'proposer_owner_id': proposer_team.get('owner_id'),
+                    'receiver_team_name': target_team.get('name', 'Unknown Team'),
+                    'receiver_owner_id': target_team.get('owner_id')
+                }
             )
             
             if result.get('success'):
                 trade_id = result.get('trade_id')
                 
-                # Send notification to target team
+                # Notify the target team and emit the real-time event (ids only;
+                # clients fetch trade details on demand)
+                notification = None
                 if self.notification_service and target_team.get('owner_id'):
-                    try:
-                        # Note: Using sync call - notification service will handle async internally
-                        self.notification_service.send_trade_proposal_notification(
-                            target_team['owner_id'], {
-                                'id': trade_id,
-                                'proposer_team_name': proposer_team.get('name', 'Unknown Team'),
-                                'league_id': league_id
-                            }
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending trade notification: {str(e)}")
+                    notification = (self.notification_service.send_trade_proposal_notification, (
+                        target_team['owner_id'], {
+                            'id': trade_id,
+                            'proposer_team_name': proposer_team.get('name', 'Unknown Team'),
+                            'league_id': league_id
+                        }
+                    ))
                 
-                # Emit real-time event
-                if self.socketio:
-                    self.socketio.emit('trade_proposed', {
-                        'trade_id': trade_id,
-                        'league_id': league_id,
-                        'proposer_team': proposer_team.get('name', 'Unknown Team'),
-                        'target_team': target_team.get('name', 'Unknown Team'),
-                        'proposer_players': proposer_players,
-                        'target_players': target_players
-                    }, room=f"league_{league_id}")
+                self._dispatch_trade_side_effects(league_room, 'trade_proposed', {
+                    'trade_id': trade_id,
+                    'league_id': league_id
+                }, notification)
                 
                 logger.info(f"Trade proposed: {proposer_team.get('name')} to {target_team.get('name')}")
                 return result
@@ -130,67 +191,85 @@ class TradeService:
         Returns:
             Validation result with status and reason
         """
+        # Basic validation
+        if proposer_team_id == target_team_id:
+            return {'valid': False, 'reason': 'Cannot trade with yourself'}
+        
+        if not proposer_players and not target_players:
+            return {'valid': False, 'reason': 'Trade must include at least one player'}
+        
+        if len(proposer_players) > 5 or len(target_players) > 5:
+            return {'valid': False, 'reason': 'Maximum 5 players per side in trade'}
+        
+        # Only the Firestore reads can fail unexpectedly
         try:
-            # Basic validation
-            if proposer_team_id == target_team_id:
-                return {'valid': False, 'reason': 'Cannot trade with yourself'}
-            
-            if not proposer_players and not target_players:
-                return {'valid': False, 'reason': 'Trade must include at least one player'}
-            
-            if len(proposer_players) > 5 or len(target_players) > 5:
-                return {'valid': False, 'reason': 'Maximum 5 players per side in trade'}
-            
-            # Get teams
             proposer_team = self.team_model.get_team(league_id, proposer_team_id)
             target_team = self.team_model.get_team(league_id, target_team_id)
-            
-            if not proposer_team or not target_team:
-                return {'valid': False, 'reason': 'One or both teams not found'}
-            
-            # Check trade deadline
             league = self.league_model.get_league(league_id)
-            if league and league.get('settings', {}).get('trade_deadline'):
-                trade_deadline = league['settings']['trade_deadline']
-                if isinstance(trade_deadline, str):
-                    trade_deadline = datetime.fromisoformat(trade_deadline)
-                if datetime.utcnow() > trade_deadline:
-                    return {'valid': False, 'reason': 'Trade deadline has passed'}
-            
-            # Check if transactions are locked
-            if league and league.get('transactions_locked'):
-                return {'valid': False, 'reason': 'Transactions are currently locked by commissioner'}
-            
-            # Validate player ownership
-            proposer_roster = proposer_team.get('roster', {})
-            target_roster = target_team.get('roster', {})
-            
-            proposer_all_players = (proposer_roster.get('starters', []) + 
-                                  proposer_roster.get('bench', []))
-            target_all_players = (target_roster.get('starters', []) + 
-                                target_roster.get('bench', []))
-            
-            for player_id in proposer_players:
-                if player_id not in proposer_all_players:
-                    return {'valid': False, 'reason': f'Proposer does not own player {player_id}'}
-            
-            for player_id in target_players:
-                if player_id not in target_all_players:
-                    return {'valid': False, 'reason': f'Target team does not own player {player_id}'}
-            
-            # Check roster limits after trade
-            roster_check = self._validate_post_trade_rosters(
-                proposer_team, target_team, proposer_players, target_players
-            )
-            
-            if not roster_check['valid']:
-                return roster_check
-            
-            return {'valid': True, 'reason': 'Trade proposal is valid'}
-            
-        except Exception as e:
+        except GoogleAPIError as e:
             logger.error(f"Error validating trade proposal: {str(e)}")
             return {'valid': False, 'reason': f'Validation error: {str(e)}'}
+        
+        try:
+            self._check_trade_invariants(league, proposer_team, target_team,
+                                         proposer_players, target_players)
+        except TradeValidationError as e:
+            return {'valid': False, 'reason': str(e)}
+        
+        return {'valid': True, 'reason': 'Trade proposal is valid'}
+
+    def _check_trade_invariants(self, league: Optional[Dict], proposer_team: Optional[Dict],
+                                target_team: Optional[Dict], proposer_players: List[int],
+                                target_players: List[int]) -> None:
+        """
+        Check league rules for a trade against already loaded league and team data.
+        
+        Args:
+            league: League data
+            proposer_team: Proposer team data
+            target_team: Target team data
+            proposer_players: Player IDs from proposer
+            target_players: Player IDs from target
+            
+        Raises:
+            TradeValidationError: If the trade breaks a rule
+        """
+        if not proposer_team or not target_team:
+            raise TradeValidationError('One or both teams not found')
+        
+        # Check trade deadline
+        if league and league.get('settings', {}).get('trade_deadline'):
+            try:
+                deadline_passed = _as_utc(self._now()) > _deadline_utc(league['settings']['trade_deadline'])
+            except (ValueError, TypeError, AttributeError):
+                logger.warning(f"Invalid trade deadline for league {league.get('id')}")
+                raise TradeValidationError('League trade deadline is invalid')
+            if deadline_passed:
+                raise TradeValidationError('Trade deadline has passed')
+        
+        # Check if transactions are locked
+        if league and league.get('transactions_locked'):
+            raise TradeValidationError('Transactions are currently locked by commissioner')
+        
+        # Validate player ownership
+        proposer_all_players = _roster_set(proposer_team)
+        target_all_players = _roster_set(target_team)
+        
+        for player_id in proposer_players:
+            if player_id not in proposer_all_players:
+                raise TradeValidationError(f'Proposer does not own player {player_id}')
+        
+        for player_id in target_players:
+            if player_id not in target_all_players:
+                raise TradeValidationError(f'Target team does not own player {player_id}')
+        
+        # Check roster limits after trade
+        roster_check = self._validate_post_trade_rosters(
+            proposer_team, target_team, proposer_players, target_players
+        )
+        
+        if not roster_check['valid']:
+            raise TradeValidationError(roster_check['reason'])
 
     def _validate_post_trade_rosters(self, proposer_team: Dict, target_team: Dict,
                                    proposer_players: List[int], target_players: List[int]) -> Dict[str, Any]:
@@ -206,47 +285,37 @@ class TradeService:
         Returns:
             Validation result
         """
-        try:
-            # Get current rosters
-            proposer_roster = proposer_team.get('roster', {})
-            target_roster = target_team.get('roster', {})
-            
-            proposer_all_players = (proposer_roster.get('starters', []) + 
-                                  proposer_roster.get('bench', []))
-            target_all_players = (target_roster.get('starters', []) + 
-                                target_roster.get('bench', []))
-            
-            # Simulate trade
-            new_proposer_players = [p for p in proposer_all_players if p not in proposer_players]
-            new_proposer_players.extend([p for p in target_all_players if p in target_players])
-            
-            new_target_players = [p for p in target_all_players if p not in target_players]
-            new_target_players.extend([p for p in proposer_all_players if p in proposer_players])
-            
-            # Check roster size limits
-            max_roster_size = 15  # Standard FPL roster size
-            min_roster_size = 11
-            
-            if len(new_proposer_players) > max_roster_size:
-                return {'valid': False, 'reason': 'Proposer roster would exceed maximum size'}
-            
-            if len(new_target_players) > max_roster_size:
-                return {'valid': False, 'reason': 'Target roster would exceed maximum size'}
-            
-            if len(new_proposer_players) < min_roster_size:
-                return {'valid': False, 'reason': 'Proposer roster would be below minimum size'}
-            
-            if len(new_target_players) < min_roster_size:
-                return {'valid': False, 'reason': 'Target roster would be below minimum size'}
-            
-            # Note: Position validation would require player position data
-            # This is a simplified version - full implementation would check GK/DEF/MID/FWD limits
-            
-            return {'valid': True, 'reason': 'Post-trade rosters are valid'}
-            
-        except Exception as e:
-            logger.error(f"Error validating post-trade rosters: {str(e)}")
-            return {'valid': False, 'reason': f'Roster validation error: {str(e)}'}
+        # Get current rosters
+        proposer_all_players = _roster_set(proposer_team)
+        target_all_players = _roster_set(target_team)
+        
+        # Simulate trade
+        outgoing_proposer = proposer_all_players.intersection(proposer_players)
+        outgoing_target = target_all_players.intersection(target_players)
+        
+        new_proposer_players = (proposer_all_players - outgoing_proposer) | outgoing_target
+        new_target_players = (target_all_players - outgoing_target) | outgoing_proposer
+        
+        # Check roster size limits
+        max_roster_size = 15  # Standard FPL roster size
+        min_roster_size = 11
+        
+        if len(new_proposer_players) > max_roster_size:
+            return {'valid': False, 'reason': 'Proposer roster would exceed maximum size'}
+        
+        if len(new_target_players) > max_roster_size:
+            return {'valid': False, 'reason': 'Target roster would exceed maximum size'}
+        
+        if len(new_proposer_players) < min_roster_size:
+            return {'valid': False, 'reason': 'Proposer roster would be below minimum size'}
+        
+        if len(new_target_players) < min_roster_size:
+            return {'valid': False, 'reason': 'Target roster would be below minimum size'}
+        
+        # Note: Position validation would require player position data
+        # This is a simplified version - full implementation would check GK/DEF/MID/FWD limits
+        
+        return {'valid': True, 'reason': 'Post-trade rosters are valid'}
 
     def accept_trade(self, league_id: str, trade_id: str, user_id: str) -> Dict[str, Any]:
         """
@@ -260,29 +329,25 @@ class TradeService:
         Returns:
             Trade acceptance result
         """
+        league_room = f"league_{league_id}"
         try:
             # Use trade model to accept the trade
             result = self.trade_model.accept_trade(league_id, trade_id, user_id)
             
             if result.get('success'):
-                # Send notifications
-                trade = self.trade_model.get_trade(league_id, trade_id)
-                if trade and self.notification_service:
-                    try:
-                        # Notify the proposer
-                        self.notification_service.send_trade_acceptance_notification(
-                            trade.get('proposer_team_id'), trade_id, league_id
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending acceptance notification: {str(e)}")
+                # Notify the proposer and emit the real-time event
+                trade = result.get('trade')
+                notification = None
+                owner_id = trade and self._get_trade_owner(league_id, trade, 'proposer', {})
+                if owner_id and self.notification_service:
+                    notification = (self.notification_service.send_trade_acceptance_notification,
+                                    (owner_id, trade_id, league_id))
                 
-                # Emit real-time event
-                if self.socketio:
-                    self.socketio.emit('trade_accepted', {
-                        'trade_id': trade_id,
-                        'league_id': league_id,
-                        'message': 'Trade has been accepted'
-                    }, room=f"league_{league_id}")
+                self._dispatch_trade_side_effects(league_room, 'trade_accepted', {
+                    'trade_id': trade_id,
+                    'league_id': league_id,
+                    'message': 'Trade has been accepted'
+                }, notification)
                 
                 logger.info(f"Trade {trade_id} accepted by user {user_id}")
             
@@ -306,30 +371,26 @@ class TradeService:
         Returns:
             Trade rejection result
         """
+        league_room = f"league_{league_id}"
         try:
             # Use trade model to reject the trade
             result = self.trade_model.reject_trade(league_id, trade_id, user_id)
             
             if result.get('success'):
-                # Send notification
-                trade = self.trade_model.get_trade(league_id, trade_id)
-                if trade and self.notification_service:
-                    try:
-                        # Notify the proposer
-                        self.notification_service.send_trade_rejection_notification(
-                            trade.get('proposer_team_id'), trade_id, reason, league_id
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending rejection notification: {str(e)}")
+                # Notify the proposer and emit the real-time event
+                trade = result.get('trade')
+                notification = None
+                owner_id = trade and self._get_trade_owner(league_id, trade, 'proposer', {})
+                if owner_id and self.notification_service:
+                    notification = (self.notification_service.send_trade_rejection_notification,
+                                    (owner_id, trade_id, reason, league_id))
                 
-                # Emit real-time event
-                if self.socketio:
-                    self.socketio.emit('trade_rejected', {
-                        'trade_id': trade_id,
-                        'league_id': league_id,
-                        'reason': reason,
-                        'message': 'Trade has been rejected'
-                    }, room=f"league_{league_id}")
+                self._dispatch_trade_side_effects(league_room, 'trade_rejected', {
+                    'trade_id': trade_id,
+                    'league_id': league_id,
+                    'reason': reason,
+                    'message': 'Trade has been rejected'
+                }, notification)
                 
                 logger.info(f"Trade {trade_id} rejected by user {user_id}")
             
@@ -351,29 +412,25 @@ class TradeService:
         Returns:
             Trade cancellation result
         """
+        league_room = f"league_{league_id}"
         try:
             # Use trade model to cancel the trade
             result = self.trade_model.cancel_trade(league_id, trade_id, user_id)
             
             if result.get('success'):
-                # Send notification
-                trade = self.trade_model.get_trade(league_id, trade_id)
-                if trade and self.notification_service:
-                    try:
-                        # Notify the target team
-                        self.notification_service.send_trade_cancellation_notification(
-                            trade.get('receiver_team_id'), trade_id, league_id
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending cancellation notification: {str(e)}")
+                # Notify the target team and emit the real-time event
+                trade = result.get('trade')
+                notification = None
+                owner_id = trade and self._get_trade_owner(league_id, trade, 'receiver', {})
+                if owner_id and self.notification_service:
+                    notification = (self.notification_service.send_trade_cancellation_notification,
+                                    (owner_id, trade_id, league_id))
                 
-                # Emit real-time event
-                if self.socketio:
-                    self.socketio.emit('trade_cancelled', {
-                        'trade_id': trade_id,
-                        'league_id': league_id,
-                        'message': 'Trade has been cancelled'
-                    }, room=f"league_{league_id}")
+                self._dispatch_trade_side_effects(league_room, 'trade_cancelled', {
+                    'trade_id': trade_id,
+                    'league_id': league_id,
+                    'message': 'Trade has been cancelled'
+                }, notification)
                 
                 logger.info(f"Trade {trade_id} cancelled by user {user_id}")
             
@@ -383,6 +440,37 @@ class TradeService:
             logger.error(f"Error cancelling trade: {str(e)}")
             return {'success': False, 'error': 'Failed to cancel trade'}
 
+    def _dispatch_trade_side_effects(self, room: str, event: str, payload: Dict[str, Any],
+                                     notification: Tuple[Callable, tuple] = None) -> None:
+        """
+        Send a trade notification and socket event concurrently.
+        
+        Both run as SocketIO background tasks so the request returns once the trade
+        write has committed, instead of waiting on each side effect in turn.
+        
+        Args:
+            room: SocketIO room to emit to
+            event: SocketIO event name
+            payload: Event payload
+            notification: Optional (async notification method, args) pair
+        """
+        if not self.socketio:
+            # Without a SocketIO server there is nothing to schedule tasks on
+            if notification:
+                self._run_notification(*notification)
+            return
+        
+        if notification:
+            self.socketio.start_background_task(self._run_notification, *notification)
+        self.socketio.start_background_task(self.socketio.emit, event, payload, room=room)
+
+    def _run_notification(self, send: Callable, args: tuple) -> None:
+        """Run an async notification method to completion, logging any failure."""
+        try:
+            asyncio.run(send(*args))
+        except Exception as e:
+            logger.error(f"Error sending trade notification: {str(e)}")
+
     def get_active_trades(self, league_id: str, team_id: str = None) -> List[Dict[str, Any]]:
         """
         Get active trades for a league or team.
@@ -441,6 +529,7 @@ class TradeService:
         Returns:
             Update result
         """
+        blocks_room = f"league_{league_id}:blocks"
         try:
             # Verify user owns the team
             team = self.team_model.get_team(league_id, team_id)
@@ -451,13 +540,11 @@ class TradeService:
             result = self.trade_model.update_trading_block(league_id, team_id, player_ids)
             
             if result.get('success') and self.socketio:
-                # Emit real-time update
+                # Emit real-time update to clients that opted into trading block updates
                 self.socketio.emit('trading_block_updated', {
                     'league_id': league_id,
-                    'team_id': team_id,
-                    'player_ids': player_ids,
-                    'team_name': team.get('name', 'Unknown Team')
-                }, room=f"league_{league_id}")
+                    'team_id': team_id
+                }, room=blocks_room)
             
             return result
             
@@ -476,34 +563,29 @@ class TradeService:
             List of players on trading blocks
         """
         try:
-            # Get all teams in league
-            teams = self.team_model.get_league_teams(league_id)
+            # Get all teams in league; trading blocks live on the team documents,
+            # so this single read covers every team
+            teams = self._get_league_teams(league_id)
             if not teams:
                 return []
             
+            now = self._now()
             all_trading_block_players = []
             
             for team in teams:
                 team_id = team['id']
-                trading_block = self.trade_model.get_team_trading_block(league_id, team_id)
+                roster = _roster_set(team)
                 
-                # Add team info to each player
-                for player_id in trading_block:
-                    # Get player details from team roster
-                    roster = team.get('roster', {})
-                    all_players = roster.get('starters', []) + roster.get('bench', [])
-                    
-                    for player in all_players:
-                        if player == player_id:  # Assuming player_id is the actual player data
-                            player_info = {
-                                'team_id': team_id,
-                                'team_name': team.get('name', 'Unknown Team'),
-                                'owner_id': team.get('owner_id'),
-                                'player_id': player_id,
-                                'added_to_block': datetime.utcnow()  # This would be stored in a real implementation
-                            }
-                            all_trading_block_players.append(player_info)
-                            break
+                # Add team info to each player still on the roster
+                for player_id in team.get('trading_block', []):
+                    if player_id in roster:
+                        all_trading_block_players.append({
+                            'team_id': team_id,
+                            'team_name': team.get('name', 'Unknown Team'),
+                            'owner_id': team.get('owner_id'),
+                            'player_id': player_id,
+                            'added_to_block': now  # This would be stored in a real implementation
+                        })
             
             return all_trading_block_players
             
@@ -511,15 +593,18 @@ class TradeService:
             logger.error(f"Error getting league trading block: {str(e)}")
             return []
 
-    def process_trade_deadlines(self) -> Dict[str, Any]:
+    def process_trade_deadlines(self, now: datetime = None) -> Dict[str, Any]:
         """
         Process trade deadline enforcement across all leagues.
         
+        Args:
+            now: Reference time for the run (background workers pass their own)
+            
         Returns:
             Processing summary
         """
         try:
-            current_time = datetime.utcnow()
+            current_time = now or self._now()
             leagues_processed = 0
             trades_cancelled = 0
             
@@ -538,6 +623,23 @@ class TradeService:
             logger.error(f"Error processing trade deadlines: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def _get_trade_owner(self, league_id: str, trade: Dict[str, Any], side: str,
+                         owners: Dict[str, Optional[str]]) -> Optional[str]:
+        """
+        Get the owner of one side of a trade.
+        
+        Uses the owner ID denormalized onto the trade and only falls back to a
+        single league teams read (memoized in owners) for older trade documents.
+        """
+        owner_id = trade.get(f'{side}_owner_id')
+        if owner_id:
+            return owner_id
+        
+        if not owners:
+            owners.update({team['id']: team.get('owner_id')
+                           for team in self._get_league_teams(league_id)})
+        return owners.get(trade.get(f'{side}_team_id'))
+
     def get_trade_analytics(self, league_id: str) -> Dict[str, Any]:
         """
         Get trade analytics for a league.
@@ -549,14 +651,11 @@ class TradeService:
             Trade analytics data
         """
         try:
-            # Get all trades in league
-            all_trades = self.trade_model.get_trade_history(league_id, limit=1000)
-            
-            # Calculate analytics
-            total_trades = len(all_trades)
-            completed_trades = len([t for t in all_trades if t.get('status') == 'accepted'])
-            pending_trades = len([t for t in all_trades if t.get('status') == 'pending'])
-            rejected_trades = len([t for t in all_trades if t.get('status') == 'rejected'])
+            # Count trades server-side instead of transferring every document
+            total_trades = self.trade_model.count_trades(league_id)
+            completed_trades = self.trade_model.count_trades(league_id, 'accepted')
+            pending_trades = self.trade_model.count_trades(league_id, 'pending')
+            rejected_trades = self.trade_model.count_trades(league_id, 'rejected')
             
             # Calculate success rate
             proposed_trades = completed_trades + rejected_trades
@@ -564,8 +663,7 @@ class TradeService:
             
             # Most active traders
             trader_activity = {}
-            for trade in all_trades:
-                proposer = trade.get('proposer_team_id')
+            for proposer in self.trade_model.get_trade_proposers(league_id, limit=1000):
                 if proposer:
                     trader_activity[proposer] = trader_activity.get(proposer, 0) + 1
             
@@ -578,7 +676,7 @@ class TradeService:
                 'rejected_trades': rejected_trades,
                 'success_rate': round(success_rate, 1),
                 'most_active_traders': most_active,
-                'generated_at': datetime.utcnow().isoformat()
+                'generated_at': self._now().isoformat()
             }
             
         except Exception as e:
@@ -623,15 +721,18 @@ class TradeService:
             logger.error(f"Error validating trade fairness: {str(e)}")
             return {'error': str(e)}
 
-    def cleanup_expired_trades(self) -> int:
+    def cleanup_expired_trades(self, now: datetime = None) -> int:
         """
         Clean up expired trades.
         
+        Args:
+            now: Reference time for the run (background workers pass their own)
+            
         Returns:
             Number of trades cleaned up
         """
         try:
-            current_time = datetime.utcnow()
+            current_time = now or self._now()
             expired_count = 0
             
             # Get all active trades
@@ -643,4 +744,4 @@ class TradeService:
             
         except Exception as e:
             logger.error(f"Error cleaning up expired trades: {str(e)}")
-            return 0
\ No newline at end of file
+            return 0
@@ -1,9 +1,18 @@
 """
 Waiver service for handling waiver wire operations.
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable
 from datetime import datetime, timedelta
+import queue
+import threading
 import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter, itemgetter
+from cachetools import TTLCache
+from firebase_admin import firestore
 from .. import get_db, get_socketio
 from ..models.team_model import TeamModel
 from ..models.player_model import PlayerModel
@@ -12,6 +21,104 @@ from ..utils.logger import get_logger
 
 logger = get_logger('waiver_service')
 
+# Writes per batch commit during waiver processing, kept under Firestore's
+# 500-write cap with room for one claim's execution writes plus the waiver
+# order and per-team waiver_position updates (leagues have at most 18 teams)
+WAIVER_BATCH_WRITE_LIMIT = 450
+
+# A waivers_processing flag older than this is assumed to be left over from
+# a crashed run and may be taken over
+WAIVERS_LOCK_TIMEOUT = timedelta(minutes=30)
+
+# Claim fields needed for processing and summaries; projecting to these skips
+# notes and other fields that only the full claim view uses
+CLAIM_SUMMARY_FIELDS = ['id', 'team_id', 'player_id', 'drop_player_id',
+                        'bid_amount', 'priority', 'status', 'claimed_at']
+
+# Rostered player IDs per league, so bursts of claim submissions share one
+# roster scan. Entries are dropped as soon as a claim changes a roster.
+_drafted_players_cache = TTLCache(maxsize=1024, ttl=30)
+_drafted_players_cache_lock = threading.Lock()
+
+# Chat notifications and broadcasts run on a background worker so requests
+# return once claim writes are durable. The queue is bounded; when it is
+# full new notifications are dropped rather than blocking the request.
+_notification_queue = queue.Queue(maxsize=1024)
+_notification_worker = None
+_notification_worker_lock = threading.Lock()
+
+def _run_notification_worker() -> None:
+    """Consume queued notification jobs forever."""
+    while True:
+        send, args = _notification_queue.get()
+        try:
+            send(*args)
+        except Exception as e:
+            logger.error(f"Failed to send waiver notification: {e}")
+        finally:
+            _notification_queue.task_done()
+
+def _enqueue_notification(send, *args) -> None:
+    """Queue a notification job, starting the worker thread on first use."""
+    global _notification_worker
+    with _notification_worker_lock:
+        if _notification_worker is None:
+            _notification_worker = threading.Thread(
+                target=_run_notification_worker, name='waiver-notify', daemon=True
+            )
+            _notification_worker.start()
+    
+    try:
+        _notification_queue.put_nowait((send, args))
+    except queue.Full:
+        logger.warning(f"Waiver notification queue full, dropping {getattr(send, '__name__', send)}")
+
+@lru_cache(maxsize=256)
+def _claims_collection_ref(db, league_id: str):
+    """Return the waiver claims collection reference for a league, built once per client."""
+    return db.collection('leagues').document(league_id).collection('waiver_claims')
+
+@dataclass(slots=True)
+class WaiverClaim:
+    """In-memory waiver claim used while processing; documents stay dicts at the DB boundary."""
+    id: str
+    team_id: str
+    player_id: int
+    drop_player_id: Optional[int]
+    bid_amount: int
+    priority: int
+    status: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WaiverClaim':
+        """Build a claim from a waiver claim document."""
+        return cls(
+            id=data['id'],
+            team_id=data['team_id'],
+            player_id=data['player_id'],
+            drop_player_id=data.get('drop_player_id'),
+            bid_amount=data['bid_amount'],
+            priority=data['priority'],
+            status=data['status']
+        )
+
+@dataclass(slots=True)
+class _OperationCache:
+    """
+    Documents loaded during one public WaiverService call.
+    
+    Each entry point creates its own and passes it down, so the shared service
+    instance never carries state from one request or job into another.
+    """
+    teams: Dict[tuple, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    players: Dict[Any, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    waiver_orders: Dict[str, List[str]] = field(default_factory=dict)
+    pending_claims: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+def _claim_sort_key(priority: int, bid_amount: float) -> float:
+    """Rank a claim by priority (lower number = higher priority), then highest bid."""
+    return priority * 1_000_000_000 - bid_amount
+
 class WaiverService:
     """Service for managing waiver wire operations."""
     
@@ -22,15 +129,35 @@ class WaiverService:
         self.chat_model = ChatModel()
         self.socketio = get_socketio()
     
+    def _cached_get_team(self, cache: _OperationCache, league_id: str,
+                         team_id: str) -> Optional[Dict[str, Any]]:
+        """Get a team, reusing any copy already fetched during this operation."""
+        key = (league_id, team_id)
+        if key not in cache.teams:
+            cache.teams[key] = self.team_model.get_team(league_id, team_id)
+        return cache.teams[key]
+    
+    def _cached_get_player(self, cache: _OperationCache, player_id: int) -> Optional[Dict[str, Any]]:
+        """Get a player, reusing any copy already fetched during this operation."""
+        if player_id not in cache.players:
+            cache.players[player_id] = self.player_model.get_player(player_id)
+        return cache.players[player_id]
+    
     def submit_waiver_claim(self, league_id: str, claim_data: Dict[str, Any]) -> Dict[str, Any]:
         """Submit a waiver claim."""
+        cache = _OperationCache()
         try:
             # Validate claim data
-            validation = self._validate_waiver_claim(league_id, claim_data)
+            validation = self._validate_waiver_claim(league_id, claim_data, cache)
             if not validation['valid']:
                 return {'success': False, 'error': validation['error']}
             
+            # Reuse the team and player documents validation already loaded
+            team = validation['team']
+            player = validation['player']
+            
             claim_id = str(uuid.uuid4())
+            priority = self._calculate_claim_priority(league_id, claim_data['team_id'], team, cache)
             
             # Create waiver claim document
             claim_doc = {
@@ -40,7 +167,8 @@ class WaiverService:
                 'player_id': claim_data['player_id'],
                 'drop_player_id': claim_data.get('drop_player_id'),
                 'bid_amount': claim_data['bid_amount'],
-                'priority': self._calculate_claim_priority(league_id, claim_data['team_id']),
+                'priority': priority,
+                'sort_key': _claim_sort_key(priority, claim_data['bid_amount']),
                 'status': 'pending',
                 'claimed_at': datetime.utcnow(),
                 'processed_at': None,
@@ -48,19 +176,14 @@ class WaiverService:
             }
             
             # Store claim
-            doc_ref = (self.db.collection('leagues').document(league_id)
-                      .collection('waiver_claims').document(claim_id))
+            doc_ref = self._claims_collection(league_id).document(claim_id)
             doc_ref.set(claim_doc)
             
-            # Get team and player info for notifications
-            team = self.team_model.get_team(league_id, claim_data['team_id'])
-            player = self.player_model.get_player(claim_data['player_id'])
-            
             team_name = team.get('name', 'Unknown Team') if team else 'Unknown Team'
             player_name = player.get('name', 'Unknown Player') if player else 'Unknown Player'
             
-            # Send notification
-            self.chat_model.send_waiver_notification(league_id, {
+            # Notify the league in the background
+            _enqueue_notification(self._send_claim_submitted_notifications, league_id, {
                 'claim_id': claim_id,
                 'team_id': claim_data['team_id'],
                 'team_name': team_name,
@@ -70,15 +193,6 @@ class WaiverService:
                 'status': 'submitted'
             })
             
-            # Broadcast to league
-            self.socketio.emit('waiver_claim_submitted', {
-                'league_id': league_id,
-                'team_id': claim_data['team_id'],
-                'team_name': team_name,
-                'player_name': player_name,
-                'claim_id': claim_id
-            }, room=f'league_{league_id}')
-            
             logger.info(f"Waiver claim {claim_id} submitted for player {claim_data['player_id']}")
             
             return {
@@ -92,35 +206,27 @@ class WaiverService:
             return {'success': False, 'error': 'Failed to submit waiver claim'}
     
     def get_waiver_claims(self, league_id: str, team_id: str = None, 
-                         status: str = None) -> List[Dict[str, Any]]:
-        """Get waiver claims for a league or team."""
+                         status: str = None, enrich: bool = True) -> List[Dict[str, Any]]:
+        """Get waiver claims for a league or team, optionally with player and team info."""
         try:
-            claims_ref = (self.db.collection('leagues').document(league_id)
-                         .collection('waiver_claims'))
-            
-            # Apply filters
-            if team_id:
-                claims_ref = claims_ref.where('team_id', '==', team_id)
-            
-            if status:
-                claims_ref = claims_ref.where('status', '==', status)
+            claims = self._get_waiver_claims_raw(league_id, team_id=team_id, status=status)
+            if not claims or not enrich:
+                return claims
             
-            # Order by priority and time
-            claims_ref = claims_ref.order_by('priority').order_by('claimed_at')
-            
-            claims = [doc.to_dict() for doc in claims_ref.stream()]
+            # Fetch every referenced player and team in one batched read each
+            player_ids = ({c['player_id'] for c in claims} |
+                          {c['drop_player_id'] for c in claims if c.get('drop_player_id')})
+            players_by_id = self._bulk_get(self.db.collection('players'), player_ids)
+            teams_by_id = self._bulk_get(self._teams_collection(league_id),
+                                         {c['team_id'] for c in claims})
             
             # Enhance with player and team info
             for claim in claims:
-                player = self.player_model.get_player(claim['player_id'])
-                team = self.team_model.get_team(league_id, claim['team_id'])
-                
-                claim['player_info'] = player
-                claim['team_info'] = team
+                claim['player_info'] = players_by_id.get(str(claim['player_id']))
+                claim['team_info'] = teams_by_id.get(str(claim['team_id']))
                 
                 if claim.get('drop_player_id'):
-                    drop_player = self.player_model.get_player(claim['drop_player_id'])
-                    claim['drop_player_info'] = drop_player
+                    claim['drop_player_info'] = players_by_id.get(str(claim['drop_player_id']))
             
             return claims
             
@@ -128,6 +234,49 @@ class WaiverService:
             logger.error(f"Failed to get waiver claims: {e}")
             return []
     
+    def _get_waiver_claims_raw(self, league_id: str, team_id: str = None, status: str = None,
+                               fields: List[str] = None) -> List[Dict[str, Any]]:
+        """Get waiver claim documents ordered by priority and time, optionally projected to fields."""
+        claims_ref = self._claims_collection(league_id)
+        
+        if fields:
+            claims_ref = claims_ref.select(fields)
+        
+        # Apply filters
+        if team_id:
+            claims_ref = claims_ref.where('team_id', '==', team_id)
+        
+        if status:
+            claims_ref = claims_ref.where('status', '==', status)
+        
+        # Order by priority and time
+        claims_ref = claims_ref.order_by('priority').order_by('claimed_at')
+        
+        return [doc.to_dict() for doc in claims_ref.stream()]
+    
+    def _pending_snapshot(self, league_id: str, cache: _OperationCache) -> List[Dict[str, Any]]:
+        """
+        Get the league's pending claims ordered by player, then rank, then claim time.
+        
+        Claims are ranked by their stored sort_key, or by the same key computed
+        from priority and bid for claims submitted before sort_key existed. The
+        sort happens here because an ordered query would silently leave those
+        older claims out. The snapshot is read once and shared by every helper
+        for the rest of the operation.
+        """
+        if league_id not in cache.pending_claims:
+            claims_ref = (self._claims_collection(league_id)
+                         .select(CLAIM_SUMMARY_FIELDS + ['sort_key'])
+                         .where('status', '==', 'pending'))
+            claims = [doc.to_dict() for doc in claims_ref.stream()]
+            claims.sort(key=lambda c: (
+                c['player_id'],
+                c.get('sort_key', _claim_sort_key(c['priority'], c['bid_amount'])),
+                c['claimed_at']
+            ))
+            cache.pending_claims[league_id] = claims
+        return cache.pending_claims[league_id]
+    
     def cancel_waiver_claim(self, league_id: str, claim_id: str, team_id: str) -> Dict[str, Any]:
         """Cancel a pending waiver claim."""
         try:
@@ -145,8 +294,7 @@ class WaiverService:
                 return {'success': False, 'error': 'Can only cancel pending claims'}
             
             # Update claim status
-            doc_ref = (self.db.collection('leagues').document(league_id)
-                      .collection('waiver_claims').document(claim_id))
+            doc_ref = self._claims_collection(league_id).document(claim_id)
             doc_ref.update({
                 'status': 'cancelled',
                 'processed_at': datetime.utcnow()
@@ -165,11 +313,20 @@ class WaiverService:
     
     def process_waivers(self, league_id: str) -> Dict[str, Any]:
         """Process all pending waiver claims for a league."""
+        cache = _OperationCache()
+        league_ref = self.db.collection('leagues').document(league_id)
+        acquired = False
         try:
+            # Only one run per league may process claims at a time
+            acquired = self._acquire_waivers_lock(league_ref)
+            if not acquired:
+                logger.warning(f"Waivers already being processed for league {league_id}")
+                return {'success': False, 'error': 'Waivers are already being processed'}
+            
             logger.info(f"Processing waivers for league {league_id}")
             
-            # Get all pending claims sorted by priority
-            pending_claims = self.get_waiver_claims(league_id, status='pending')
+            # Get all pending claims grouped by player, best claim first
+            pending_claims = [WaiverClaim.from_dict(c) for c in self._pending_snapshot(league_id, cache)]
             
             if not pending_claims:
                 return {
@@ -178,63 +335,101 @@ class WaiverService:
                     'results': []
                 }
             
-            # Group claims by player
-            claims_by_player = {}
-            for claim in pending_claims:
-                player_id = claim['player_id']
-                if player_id not in claims_by_player:
-                    claims_by_player[player_id] = []
-                claims_by_player[player_id].append(claim)
+            # Load every claiming team and claimed player once for the checks and notifications
+            cache.teams.update(
+                ((league_id, team_id), team) for team_id, team in self._bulk_get(
+                    self._teams_collection(league_id), {c.team_id for c in pending_claims}
+                ).items()
+            )
+            cache.players.update(
+                (int(player_id), player) for player_id, player in self._bulk_get(
+                    self.db.collection('players'), {c.player_id for c in pending_claims}
+                ).items()
+            )
             
+            # Running budgets and rosters, so each award is checked against the
+            # claims already granted earlier in this run
+            budgets: Dict[str, int] = {}
+            rosters: Dict[str, set] = {}
+            for (_, team_id), team in cache.teams.items():
+                if team:
+                    roster = team.get('roster', {})
+                    budgets[team_id] = team.get('waiver_budget', 0)
+                    rosters[team_id] = set(roster.get('starters', ())) | set(roster.get('bench', ()))
+            rostered = set(self.player_model._get_drafted_players(league_id))
+            
+            order = self._get_waiver_order(league_id, cache)
+            written_positions: Dict[str, int] = {}
+            successful_teams = set()
             results = []
-            
-            # Process each player's claims
-            for player_id, player_claims in claims_by_player.items():
-                # Sort by priority (lower number = higher priority) then by bid amount
-                player_claims.sort(key=lambda c: (c['priority'], -c['bid_amount']))
-                
-                # Award to highest priority/bidder
-                winning_claim = player_claims[0]
-                
-                # Process winning claim
-                success = self._execute_waiver_claim(league_id, winning_claim)
+            now = datetime.utcnow()
+            
+            # Claim status changes are committed in the same batch as their roster
+            # and budget writes, together with the waiver order (and each moved
+            # team's waiver_position) so far, so a run that fails part-way can
+            # simply be re-run on the remaining pending claims
+            batch = self.db.batch()
+            batch_writes = 0
+            
+            def commit_batch():
+                if successful_teams:
+                    new_order = self._waiver_order_after(order, successful_teams)
+                    batch.update(league_ref, {'waiver_order': new_order})
+                    
+                    # Keep the per-team field that standings and older readers use in sync
+                    teams_collection = self._teams_collection(league_id)
+                    for position, team_id in enumerate(new_order, start=1):
+                        if written_positions.get(team_id) != position:
+                            batch.update(teams_collection.document(team_id),
+                                         {'waiver_position': position})
+                            written_positions[team_id] = position
+                batch.commit()
+            
+            # Process each player's claims, best ranked first
+            for player_id, group in groupby(pending_claims, key=attrgetter('player_id')):
+                awarded = player_id in rostered
                 
-                if success:
+                for claim in group:
+                    team_id = claim.team_id
+                    if (not awarded and team_id in budgets
+                            and claim.bid_amount <= budgets[team_id]
+                            and (not claim.drop_player_id or claim.drop_player_id in rosters[team_id])):
+                        batch_writes += self._add_claim_execution_writes(batch, league_id, claim, now)
+                        awarded = True
+                        successful_teams.add(team_id)
+                        
+                        budgets[team_id] -= claim.bid_amount
+                        rosters[team_id].add(player_id)
+                        rostered.add(player_id)
+                        if claim.drop_player_id:
+                            rosters[team_id].discard(claim.drop_player_id)
+                            rostered.discard(claim.drop_player_id)
+                        status = 'successful'
+                    else:
+                        self._mark_claim_failed(batch, league_id, claim.id, now)
+                        batch_writes += 1
+                        status = 'failed'
+                    
                     results.append({
-                        'claim_id': winning_claim['id'],
-                        'team_id': winning_claim['team_id'],
+                        'claim_id': claim.id,
+                        'team_id': team_id,
                         'player_id': player_id,
-                        'bid_amount': winning_claim['bid_amount'],
-                        'status': 'successful'
+                        'bid_amount': claim.bid_amount,
+                        'status': status
                     })
                     
-                    # Mark other claims for this player as failed
-                    for claim in player_claims[1:]:
-                        self._mark_claim_failed(league_id, claim['id'])
-                        results.append({
-                            'claim_id': claim['id'],
-                            'team_id': claim['team_id'],
-                            'player_id': player_id,
-                            'bid_amount': claim['bid_amount'],
-                            'status': 'failed'
-                        })
-                else:
-                    # Mark all claims as failed if execution failed
-                    for claim in player_claims:
-                        self._mark_claim_failed(league_id, claim['id'])
-                        results.append({
-                            'claim_id': claim['id'],
-                            'team_id': claim['team_id'],
-                            'player_id': player_id,
-                            'bid_amount': claim['bid_amount'],
-                            'status': 'failed'
-                        })
-            
-            # Update waiver priorities
-            self._update_waiver_priorities(league_id, results)
-            
-            # Send notifications
-            self._send_waiver_results_notifications(league_id, results)
+                    if batch_writes >= WAIVER_BATCH_WRITE_LIMIT:
+                        commit_batch()
+                        batch = self.db.batch()
+                        batch_writes = 0
+            
+            if batch_writes:
+                commit_batch()
+            self._invalidate_drafted_players(league_id)
+            
+            # Send notifications in the background as a single job
+            _enqueue_notification(self._send_waiver_results_notifications, league_id, results,
+                                  cache.teams, cache.players)
             
             logger.info(f"Processed {len(results)} waiver claims for league {league_id}")
             
@@ -247,6 +442,38 @@ class WaiverService:
         except Exception as e:
             logger.error(f"Failed to process waivers: {e}")
             return {'success': False, 'error': 'Failed to process waivers'}
+        finally:
+            if acquired:
+                self._release_waivers_lock(league_ref)
+    
+    def _acquire_waivers_lock(self, league_ref) -> bool:
+        """Atomically set the league's waivers_processing flag, returning False if already set."""
+        @firestore.transactional
+        def acquire(transaction):
+            snapshot = league_ref.get(transaction=transaction)
+            league = snapshot.to_dict() if snapshot.exists else {}
+            
+            now = datetime.utcnow()
+            started_at = league.get('waivers_started_at')
+            if league.get('waivers_processing') and started_at:
+                # Firestore returns timezone-aware timestamps
+                if now - started_at.replace(tzinfo=None) < WAIVERS_LOCK_TIMEOUT:
+                    return False
+            
+            transaction.update(league_ref, {
+                'waivers_processing': True,
+                'waivers_started_at': now
+            })
+            return True
+        
+        return acquire(self.db.transaction())
+    
+    def _release_waivers_lock(self, league_ref) -> None:
+        """Clear the league's waivers_processing flag."""
+        try:
+            league_ref.update({'waivers_processing': False})
+        except Exception as e:
+            logger.error(f"Failed to release waivers lock: {e}")
     
     def get_waiver_wire_players(self, league_id: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get players available on the waiver wire."""
@@ -254,12 +481,18 @@ class WaiverService:
             # Get available players
             available_players = self.player_model.get_available_players(league_id, limit)
             
+            # Aggregate the league's pending claim snapshot per player
+            pending_counts = Counter()
+            highest_bids: Dict[int, int] = {}
+            for claim in self._pending_snapshot(league_id, _OperationCache()):
+                player_id = claim['player_id']
+                pending_counts[player_id] += 1
+                highest_bids[player_id] = max(highest_bids.get(player_id, 0), claim['bid_amount'])
+            
             # Add waiver wire specific info
             for player in available_players:
-                # Check if there are pending claims for this player
-                pending_claims = self._get_pending_claims_for_player(league_id, player['id'])
-                player['pending_claims'] = len(pending_claims)
-                player['highest_bid'] = max([c['bid_amount'] for c in pending_claims], default=0)
+                player['pending_claims'] = pending_counts[player['id']]
+                player['highest_bid'] = highest_bids.get(player['id'], 0)
             
             # Sort by trending/points
             available_players.sort(key=lambda p: p.get('total_points', 0), reverse=True)
@@ -277,18 +510,20 @@ class WaiverService:
             if not team:
                 return {}
             
-            # Get pending claims
-            pending_claims = self.get_waiver_claims(league_id, team_id, 'pending')
+            # Get all of the team's claims in one query and split them locally
+            claims = self._get_waiver_claims_raw(league_id, team_id=team_id,
+                                                 fields=CLAIM_SUMMARY_FIELDS)
+            pending_claims = [claim for claim in claims if claim['status'] == 'pending']
             
             # Calculate total pending bids
             total_pending_bids = sum(claim['bid_amount'] for claim in pending_claims)
             
             # Get recent claim history
-            recent_claims = self.get_waiver_claims(league_id, team_id)[:10]
+            recent_claims = sorted(claims, key=itemgetter('claimed_at'), reverse=True)[:10]
             
             return {
                 'waiver_budget': team.get('waiver_budget', 0),
-                'waiver_position': team.get('waiver_position', 1),
+                'waiver_position': self._calculate_claim_priority(league_id, team_id, team),
                 'pending_claims': len(pending_claims),
                 'total_pending_bids': total_pending_bids,
                 'available_budget': team.get('waiver_budget', 0) - total_pending_bids,
@@ -299,7 +534,8 @@ class WaiverService:
             logger.error(f"Failed to get team waiver info: {e}")
             return {}
     
-    def _validate_waiver_claim(self, league_id: str, claim_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_waiver_claim(self, league_id: str, claim_data: Dict[str, Any],
+                               cache: _OperationCache) -> Dict[str, Any]:
         """Validate a waiver claim."""
         errors = []
         
@@ -314,7 +550,7 @@ class WaiverService:
                 return {'valid': False, 'error': '; '.join(errors)}
             
             # Get team
-            team = self.team_model.get_team(league_id, claim_data['team_id'])
+            team = self._cached_get_team(cache, league_id, claim_data['team_id'])
             if not team:
                 return {'valid': False, 'error': 'Team not found'}
             
@@ -329,12 +565,12 @@ class WaiverService:
                 return {'valid': False, 'error': 'Bid exceeds available budget'}
             
             # Check if player is available
-            player = self.player_model.get_player(claim_data['player_id'])
+            player = self._cached_get_player(cache, claim_data['player_id'])
             if not player:
                 return {'valid': False, 'error': 'Player not found'}
             
             # Check if player is already on a roster
-            drafted_players = self.player_model._get_drafted_players(league_id)
+            drafted_players = self._drafted_players(league_id)
             if claim_data['player_id'] in drafted_players:
                 return {'valid': False, 'error': 'Player is already rostered'}
             
@@ -348,147 +584,135 @@ class WaiverService:
             # If dropping a player, validate they own that player
             if claim_data.get('drop_player_id'):
                 team_roster = team.get('roster', {})
-                all_players = (team_roster.get('starters', []) + 
-                             team_roster.get('bench', []))
+                all_players = set(team_roster.get('starters', ())) | set(team_roster.get('bench', ()))
                 
                 if claim_data['drop_player_id'] not in all_players:
                     return {'valid': False, 'error': 'Cannot drop player not on roster'}
             
-            return {'valid': True}
+            return {'valid': True, 'team': team, 'player': player}
             
         except Exception as e:
             logger.error(f"Failed to validate waiver claim: {e}")
             return {'valid': False, 'error': 'Validation failed'}
     
-    def _calculate_claim_priority(self, league_id: str, team_id: str) -> int:
-        """Calculate waiver claim priority for a team."""
+    def _calculate_claim_priority(self, league_id: str, team_id: str,
+                                  team: Optional[Dict[str, Any]] = None,
+                                  cache: Optional[_OperationCache] = None) -> int:
+        """Calculate waiver claim priority for a team, reusing a preloaded team if given."""
         try:
-            team = self.team_model.get_team(league_id, team_id)
+            if cache is None:
+                cache = _OperationCache()
+            if team is None:
+                team = self._cached_get_team(cache, league_id, team_id)
             if not team:
                 return 999  # Lowest priority if team not found
             
+            order = self._get_waiver_order(league_id, cache)
+            if team_id in order:
+                return order.index(team_id) + 1
+            
+            # The order covers every team, so this only happens if the team was just created
             return team.get('waiver_position', 1)
             
         except Exception as e:
             logger.error(f"Failed to calculate claim priority: {e}")
             return 999
     
-    def _execute_waiver_claim(self, league_id: str, claim: Dict[str, Any]) -> bool:
-        """Execute a waiver claim (add player, drop player, deduct budget)."""
-        try:
-            team_id = claim['team_id']
-            player_id = claim['player_id']
-            drop_player_id = claim.get('drop_player_id')
-            bid_amount = claim['bid_amount']
-            
-            # Add player to roster
-            success = self.team_model.add_player_to_roster(league_id, team_id, player_id, 'bench')
-            if not success:
-                return False
-            
-            # Drop player if specified
-            if drop_player_id:
-                self.team_model.remove_player_from_roster(league_id, team_id, drop_player_id)
-            
-            # Deduct bid amount from budget
-            self.team_model.spend_waiver_budget(league_id, team_id, bid_amount)
-            
-            # Mark claim as successful
-            doc_ref = (self.db.collection('leagues').document(league_id)
-                      .collection('waiver_claims').document(claim['id']))
-            doc_ref.update({
-                'status': 'successful',
-                'processed_at': datetime.utcnow()
+    def _add_claim_execution_writes(self, batch, league_id: str, claim: WaiverClaim,
+                                    now: datetime) -> int:
+        """Add the writes that execute a waiver claim to a batch and return how many were added."""
+        team_id = claim.team_id
+        player_id = claim.player_id
+        drop_player_id = claim.drop_player_id
+        bid_amount = claim.bid_amount
+        
+        team_ref = self._teams_collection(league_id).document(team_id)
+        
+        # Add player to bench and deduct bid amount from budget
+        batch.update(team_ref, {
+            'roster.bench': firestore.ArrayUnion([player_id]),
+            'waiver_budget': firestore.Increment(-bid_amount)
+        })
+        writes = 1
+        
+        # Drop player if specified
+        if drop_player_id:
+            batch.update(team_ref, {
+                'roster.starters': firestore.ArrayRemove([drop_player_id]),
+                'roster.bench': firestore.ArrayRemove([drop_player_id])
             })
-            
-            # Record transaction
-            transaction = {
-                'type': 'waiver_claim',
-                'player_id': player_id,
-                'drop_player_id': drop_player_id,
-                'bid_amount': bid_amount,
-                'claim_id': claim['id'],
-                'status': 'completed'
-            }
-            self.team_model.add_transaction(league_id, team_id, transaction)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to execute waiver claim: {e}")
-            return False
+            writes += 1
+        
+        # Mark claim as successful
+        claim_ref = self._claims_collection(league_id).document(claim.id)
+        batch.update(claim_ref, {
+            'status': 'successful',
+            'processed_at': now
+        })
+        
+        # Record transaction
+        batch.set(team_ref.collection('transactions').document(), {
+            'type': 'waiver_claim',
+            'league_id': league_id,
+            'team_id': team_id,
+            'player_id': player_id,
+            'drop_player_id': drop_player_id,
+            'bid_amount': bid_amount,
+            'claim_id': claim.id,
+            'status': 'completed',
+            'timestamp': now
+        })
+        
+        return writes + 2
     
-    def _mark_claim_failed(self, league_id: str, claim_id: str) -> None:
-        """Mark a waiver claim as failed."""
-        try:
-            doc_ref = (self.db.collection('leagues').document(league_id)
-                      .collection('waiver_claims').document(claim_id))
-            doc_ref.update({
-                'status': 'failed',
-                'processed_at': datetime.utcnow()
-            })
-        except Exception as e:
-            logger.error(f"Failed to mark claim as failed: {e}")
+    def _mark_claim_failed(self, batch, league_id: str, claim_id: str, now: datetime) -> None:
+        """Add the write marking a waiver claim as failed to batch."""
+        batch.update(self._claims_collection(league_id).document(claim_id), {
+            'status': 'failed',
+            'processed_at': now
+        })
     
-    def _update_waiver_priorities(self, league_id: str, results: List[Dict[str, Any]]) -> None:
-        """Update waiver priorities after processing."""
-        try:
-            # Teams that successfully claimed players go to end of waiver order
-            successful_teams = [r['team_id'] for r in results if r['status'] == 'successful']
-            
-            if not successful_teams:
-                return
-            
-            # Get all teams
-            teams = self.team_model.get_league_teams(league_id)
-            
-            # Sort teams by current waiver position
-            teams.sort(key=lambda t: t.get('waiver_position', 1))
-            
-            # Move successful teams to end and adjust others
-            new_positions = {}
-            position = 1
-            
-            # Assign positions to teams that didn't claim
-            for team in teams:
-                if team['id'] not in successful_teams:
-                    new_positions[team['id']] = position
-                    position += 1
-            
-            # Assign positions to teams that claimed (in order of original priority)
-            for team in teams:
-                if team['id'] in successful_teams:
-                    new_positions[team['id']] = position
-                    position += 1
-            
-            # Update team waiver positions
-            for team_id, new_position in new_positions.items():
-                self.team_model.update_waiver_position(league_id, team_id, new_position)
-            
-        except Exception as e:
-            logger.error(f"Failed to update waiver priorities: {e}")
+    @staticmethod
+    def _waiver_order_after(order: List[str], successful_teams: set) -> List[str]:
+        """Move teams that won claims to the end of the waiver order, keeping their relative order."""
+        staying, moving = [], []
+        for team_id in order:
+            (moving if team_id in successful_teams else staying).append(team_id)
+        return staying + moving
     
-    def _send_waiver_results_notifications(self, league_id: str, results: List[Dict[str, Any]]) -> None:
-        """Send notifications for waiver results."""
+    def _send_claim_submitted_notifications(self, league_id: str, notification: Dict[str, Any]) -> None:
+        """Send the chat notification and broadcast for a submitted claim."""
+        # Send notification
+        self.chat_model.send_waiver_notification(league_id, notification)
+        
+        # Broadcast to league
+        self.socketio.emit('waiver_claim_submitted', {
+            'league_id': league_id,
+            'team_id': notification['team_id'],
+            'team_name': notification['team_name'],
+            'player_name': notification['player_name'],
+            'claim_id': notification['claim_id']
+        }, room=f'league_{league_id}')
+    
+    def _send_waiver_results_notifications(self, league_id: str, results: List[Dict[str, Any]],
+                                           team_cache: Dict[tuple, Optional[Dict[str, Any]]],
+                                           player_cache: Dict[Any, Optional[Dict[str, Any]]]) -> None:
+        """Send notifications for waiver results, resolving names from already-loaded documents."""
         try:
+            results_with_names = []
             for result in results:
-                team = self.team_model.get_team(league_id, result['team_id'])
-                player = self.player_model.get_player(result['player_id'])
-                
-                team_name = team.get('name', 'Unknown Team') if team else 'Unknown Team'
-                player_name = player.get('name', 'Unknown Player') if player else 'Unknown Player'
+                team = team_cache.get((league_id, result['team_id']))
+                player = player_cache.get(result['player_id'])
                 
-                # Send chat notification
-                self.chat_model.send_waiver_notification(league_id, {
-                    'claim_id': result['claim_id'],
-                    'team_id': result['team_id'],
-                    'team_name': team_name,
-                    'player_id': result['player_id'],
-                    'player_name': player_name,
-                    'bid_amount': result['bid_amount'],
-                    'status': result['status']
+                results_with_names.append({
+                    **result,
+                    'team_name': team.get('name', 'Unknown Team') if team else 'Unknown Team',
+                    'player_name': player.get('name', 'Unknown Player') if player else 'Unknown Player'
                 })
             
+            # Send one chat summary for the whole run
+            self.chat_model.send_waiver_summary(league_id, results_with_names)
+            
             # Broadcast waiver results
             self.socketio.emit('waiver_results_processed', {
                 'league_id': league_id,
@@ -499,11 +723,74 @@ class WaiverService:
         except Exception as e:
             logger.error(f"Failed to send waiver notifications: {e}")
     
+    def _get_waiver_order(self, league_id: str, cache: _OperationCache) -> List[str]:
+        """
+        Get the league's waiver order (team IDs, highest priority first), cached per operation.
+        
+        Leagues created before waiver_order existed only gain entries as teams
+        join. When the stored order is shorter than the league's team count,
+        the teams are read once to rebuild it (unlisted teams first by their
+        stored waiver_position, then the listed teams in their existing order)
+        and the result is written back so later calls skip the scan.
+        """
+        if league_id not in cache.waiver_orders:
+            league_ref = self.db.collection('leagues').document(league_id)
+            league_doc = league_ref.get()
+            league = league_doc.to_dict() if league_doc.exists else {}
+            order = league.get('waiver_order') or []
+            
+            if league_doc.exists and (not order or len(order) < league.get('teams_count', 0)):
+                positions = {doc.id: (doc.to_dict() or {}).get('waiver_position', 1)
+                             for doc in self._teams_collection(league_id)
+                             .select(['waiver_position']).stream()}
+                listed = set(order)
+                unlisted = sorted((team_id for team_id in positions if team_id not in listed),
+                                  key=positions.get)
+                order = unlisted + [team_id for team_id in order if team_id in positions]
+                
+                try:
+                    league_ref.update({'waiver_order': order})
+                except Exception as e:
+                    logger.error(f"Failed to backfill waiver order for league {league_id}: {e}")
+            
+            cache.waiver_orders[league_id] = order
+        return cache.waiver_orders[league_id]
+    
+    def _drafted_players(self, league_id: str) -> frozenset:
+        """Get the league's rostered player IDs, cached briefly across requests."""
+        with _drafted_players_cache_lock:
+            drafted = _drafted_players_cache.get(league_id)
+        if drafted is None:
+            drafted = frozenset(self.player_model._get_drafted_players(league_id))
+            with _drafted_players_cache_lock:
+                _drafted_players_cache[league_id] = drafted
+        return drafted
+    
+    def _invalidate_drafted_players(self, league_id: str) -> None:
+        """Drop the cached rostered players for a league after its rosters change."""
+        with _drafted_players_cache_lock:
+            _drafted_players_cache.pop(league_id, None)
+    
+    def _claims_collection(self, league_id: str):
+        """Get the waiver claims collection reference for a league."""
+        return _claims_collection_ref(self.db, league_id)
+    
+    def _teams_collection(self, league_id: str):
+        """Get the teams collection reference for a league."""
+        return self.db.collection('leagues').document(league_id).collection('teams')
+    
+    def _bulk_get(self, collection_ref, ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Fetch documents by ID with a single batched read, keyed by document ID."""
+        refs = [collection_ref.document(str(doc_id)) for doc_id in ids]
+        if not refs:
+            return {}
+        
+        return {doc.id: doc.to_dict() for doc in self.db.get_all(refs) if doc.exists}
+    
     def _get_waiver_claim(self, league_id: str, claim_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific waiver claim."""
         try:
-            doc_ref = (self.db.collection('leagues').document(league_id)
-                      .collection('waiver_claims').document(claim_id))
+            doc_ref = self._claims_collection(league_id).document(claim_id)
             doc = doc_ref.get()
             
             if doc.exists:
@@ -513,24 +800,10 @@ class WaiverService:
             logger.error(f"Failed to get waiver claim: {e}")
             return None
     
-    def _get_pending_claims_for_player(self, league_id: str, player_id: int) -> List[Dict[str, Any]]:
-        """Get pending claims for a specific player."""
-        try:
-            claims_ref = (self.db.collection('leagues').document(league_id)
-                         .collection('waiver_claims')
-                         .where('player_id', '==', player_id)
-                         .where('status', '==', 'pending'))
-            
-            return [doc.to_dict() for doc in claims_ref.stream()]
-        except Exception as e:
-            logger.error(f"Failed to get pending claims for player: {e}")
-            return []
-    
     def _get_team_claim_for_player(self, league_id: str, team_id: str, player_id: int) -> Optional[Dict[str, Any]]:
         """Get team's claim for a specific player."""
         try:
-            claims_ref = (self.db.collection('leagues').document(league_id)
-                         .collection('waiver_claims')
+            claims_ref = (self._claims_collection(league_id)
                          .where('team_id', '==', team_id)
                          .where('player_id', '==', player_id)
                          .where('status', '==', 'pending')
@@ -1,18 +1,210 @@
 """
 SocketIO event handlers for real-time functionality.
 """
+from collections import defaultdict
 from flask_socketio import emit, join_room, leave_room, disconnect
-from flask import request
-from datetime import datetime
+from flask import request, session
+from datetime import datetime, timezone
+import queue
+import redis
+import secrets
+import threading
+import time
+from cachetools import TTLCache
+from typing import Dict, FrozenSet, NamedTuple
 from . import get_socketio, get_logger
+from .config import Config
 from .services.auth_service import get_auth_service
 
 logger = get_logger('socket_events')
 socketio = get_socketio()
 auth_service = get_auth_service()
 
-# Store connected users
-connected_users = {}
+# Per-connection state (user_id, leagues) lives in the Flask-SocketIO session.
+# The indexes below serve lookups made outside a handler's session.
+class PresenceSnapshot(NamedTuple):
+    """Immutable view of this worker's connected sessions."""
+    session_users: Dict[str, str]                # session_id -> user_id
+    user_sessions: Dict[str, FrozenSet[str]]     # user_id -> session_ids
+    league_sessions: Dict[str, FrozenSet[str]]   # league_id -> session_ids
+
+# Read-copy-update: writers build a new snapshot under the lock and swap the
+# reference; readers take the current snapshot once and iterate it freely
+_presence = PresenceSnapshot({}, {}, {})
+_presence_lock = threading.Lock()
+
+# Shared presence across workers. Each worker keeps its own sessions in the
+# dicts above; Redis holds every worker's sessions so targeted sends and
+# league presence see the whole deployment. Presence keys and the sets that
+# index them expire unless the session stays active; handlers refresh them at
+# most once per PRESENCE_REFRESH_SECONDS, and readers prune expired sessions.
+PRESENCE_TTL_SECONDS = 24 * 60 * 60
+PRESENCE_REFRESH_SECONDS = 5 * 60
+presence_store = (redis.Redis.from_url(Config.SOCKETIO_MESSAGE_QUEUE, decode_responses=True)
+                  if Config.SOCKETIO_MESSAGE_QUEUE else None)
+
+def _sync_presence(apply):
+    """Apply presence updates to the shared Redis store in one pipeline, if configured."""
+    if presence_store is None:
+        return
+    try:
+        pipe = presence_store.pipeline()
+        apply(pipe)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error("Failed to update shared presence: %s", e)
+
+def _expire_presence(pipe, session_id: str, user_id: str, leagues):
+    """Queue TTL refreshes for a session's presence hash and the sets that index it."""
+    pipe.expire(f'presence:{session_id}', PRESENCE_TTL_SECONDS)
+    pipe.expire(f'user_sessions:{user_id}', PRESENCE_TTL_SECONDS)
+    for league_id in leagues:
+        pipe.expire(f'league_members:{league_id}', PRESENCE_TTL_SECONDS)
+
+def _refresh_presence(user_id: str):
+    """Extend the current session's shared presence TTLs, throttled per session."""
+    if presence_store is None:
+        return
+    now = time.monotonic()
+    if now - session.get('presence_refreshed_at', 0) < PRESENCE_REFRESH_SECONDS:
+        return
+    session['presence_refreshed_at'] = now
+    
+    session_id = request.sid
+    leagues = tuple(session.get('leagues', ()))
+    _sync_presence(lambda pipe: _expire_presence(pipe, session_id, user_id, leagues))
+
+def _live_sessions(index_key: str) -> list:
+    """Members of a shared session set whose presence hash still exists, pruning the rest."""
+    session_ids = list(presence_store.smembers(index_key))
+    if not session_ids:
+        return []
+    
+    pipe = presence_store.pipeline()
+    for session_id in session_ids:
+        pipe.exists(f'presence:{session_id}')
+    alive = pipe.execute()
+    
+    stale = [session_id for session_id, exists in zip(session_ids, alive) if not exists]
+    if stale:
+        presence_store.srem(index_key, *stale)
+    return [session_id for session_id, exists in zip(session_ids, alive) if exists]
+
+class PayloadPool:
+    """
+    Free list of payload dicts reused across emits of one event type.
+    
+    Socket.IO encodes the payload before emit returns, so a dict can be
+    released as soon as the emit (and any log call) is done with it.
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        self._free = queue.LifoQueue(maxsize=maxsize)
+    
+    def acquire(self, **fields) -> dict:
+        try:
+            payload = self._free.get_nowait()
+        except queue.Empty:
+            payload = {}
+        payload.update(fields)
+        return payload
+    
+    def release(self, payload: dict):
+        payload.clear()
+        try:
+            self._free.put_nowait(payload)
+        except queue.Full:
+            pass
+
+pick_payloads = PayloadPool()
+trade_payloads = PayloadPool()
+claim_payloads = PayloadPool()
+lineup_payloads = PayloadPool()
+
+# Chat messages are buffered per league and broadcast together, so a burst
+# of messages costs one emit per member instead of one per message
+CHAT_COALESCE_SECONDS = 0.05
+_pending_chat = defaultdict(list)  # league_id -> buffered message payloads
+_pending_chat_lock = threading.Lock()
+
+def _queue_chat_message(league_id: str, message_data: dict):
+    """Buffer a chat message, scheduling a flush if the league has none pending."""
+    with _pending_chat_lock:
+        pending = _pending_chat[league_id]
+        pending.append(message_data)
+        schedule_flush = len(pending) == 1
+    
+    if schedule_flush:
+        socketio.start_background_task(_flush_chat, league_id)
+
+def _flush_chat(league_id: str):
+    """Broadcast a league's buffered chat messages as one chat_batch event."""
+    socketio.sleep(CHAT_COALESCE_SECONDS)
+    with _pending_chat_lock:
+        messages = _pending_chat.pop(league_id, None)
+    
+    if messages:
+        socketio.emit('chat_batch', messages, room=f'league_{league_id}')
+
+# Per-user event rate limits as (max events, window seconds). Counters live
+# in Redis when configured so limits hold across workers.
+CHAT_RATE_LIMIT = (10, 5)
+DRAFT_PICK_RATE_LIMIT = (5, 5)
+
+# Local fallback counters, (event, user_id) -> [window_start, count]. An entry
+# is only reassigned when its window restarts, so expiring it after the
+# longest window drops idle users instead of keeping them forever.
+_local_rate_windows = TTLCache(maxsize=10000, ttl=max(CHAT_RATE_LIMIT[1], DRAFT_PICK_RATE_LIMIT[1]))
+_local_rate_lock = threading.Lock()
+
+def _allow_event(user_id: str, event: str, limit: int, window: int) -> bool:
+    """Count an event against the user's fixed-window limit; False once it is exceeded."""
+    if presence_store is not None:
+        key = f'rl:{event}:{user_id}'
+        try:
+            # Create the counter with its expiry before incrementing, in one
+            # MULTI, so a crash between the two can't leave a counter without a TTL
+            pipe = presence_store.pipeline()
+            pipe.set(key, 0, ex=window, nx=True)
+            pipe.incr(key)
+            _, count = pipe.execute()
+            return count <= limit
+        except redis.RedisError as e:
+            logger.error("Failed to check rate limit for %s: %s", key, e)
+            return True
+    
+    now = time.monotonic()
+    with _local_rate_lock:
+        entry = _local_rate_windows.get((event, user_id))
+        if entry is None or now - entry[0] >= window:
+            _local_rate_windows[(event, user_id)] = [now, 1]
+            return True
+        entry[1] += 1
+        return entry[1] <= limit
+
+def _event_timestamp() -> str:
+    """Timezone-aware ISO timestamp for outgoing event payloads."""
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+
+def _update_presence(update):
+    """Publish the snapshot returned by update(current) as the new presence."""
+    global _presence
+    with _presence_lock:
+        _presence = update(_presence)
+
+def _with_session(index: dict, key: str, session_id: str) -> dict:
+    """Copy of a reverse index with the session added under key."""
+    return {**index, key: index.get(key, frozenset()) | {session_id}}
+
+def _without_session(index: dict, key: str, session_id: str) -> dict:
+    """Copy of a reverse index with the session removed, dropping the key once it is empty."""
+    remaining = index.get(key, frozenset()) - {session_id}
+    updated = dict(index)
+    if remaining:
+        updated[key] = remaining
+    else:
+        updated.pop(key, None)
+    return updated
 
 @socketio.on('connect')
 def handle_connect(auth):
@@ -35,17 +227,30 @@ def handle_connect(auth):
         session_id = request.sid
         
         # Store user connection
-        connected_users[session_id] = {
-            'user_id': user_id,
-            'connected_at': datetime.utcnow(),
-            'leagues': []
-        }
-        
-        logger.info(f"User {user_id} connected with session {session_id}")
+        connected_at = datetime.now(timezone.utc)
+        session['user_id'] = user_id
+        session['connected_at'] = connected_at
+        session['leagues'] = set()
+        session['presence_refreshed_at'] = time.monotonic()
+        _update_presence(lambda presence: presence._replace(
+            session_users={**presence.session_users, session_id: user_id},
+            user_sessions=_with_session(presence.user_sessions, user_id, session_id)
+        ))
+        
+        def add_presence(pipe):
+            pipe.hset(f'presence:{session_id}', mapping={
+                'user_id': user_id,
+                'connected_at': connected_at.isoformat()
+            })
+            pipe.sadd(f'user_sessions:{user_id}', session_id)
+            _expire_presence(pipe, session_id, user_id, ())
+        _sync_presence(add_presence)
+        
+        logger.info("User %s connected with session %s", user_id, session_id)
         emit('connected', {'status': 'success', 'user_id': user_id})
         
     except Exception as e:
-        logger.error(f"Connection error: {e}")
+        logger.error("Connection error: %s", e)
         disconnect()
         return False
 
@@ -54,29 +259,47 @@ def handle_disconnect():
     """Handle client disconnection."""
     try:
         session_id = request.sid
-        if session_id in connected_users:
-            user_id = connected_users[session_id]['user_id']
-            
+        user_id = session.get('user_id')
+        if user_id is not None:
             # Leave all league rooms
-            leagues = connected_users[session_id].get('leagues', [])
+            leagues = session.get('leagues', ())
             for league_id in leagues:
                 leave_room(f'league_{league_id}')
                 emit('user_left', {'user_id': user_id}, room=f'league_{league_id}')
             
             # Remove from connected users
-            del connected_users[session_id]
+            def remove_session(presence):
+                league_index = presence.league_sessions
+                for league_id in leagues:
+                    league_index = _without_session(league_index, league_id, session_id)
+                session_index = dict(presence.session_users)
+                session_index.pop(session_id, None)
+                return PresenceSnapshot(
+                    session_users=session_index,
+                    user_sessions=_without_session(presence.user_sessions, user_id, session_id),
+                    league_sessions=league_index
+                )
+            _update_presence(remove_session)
+            
+            def remove_presence(pipe):
+                pipe.delete(f'presence:{session_id}')
+                pipe.srem(f'user_sessions:{user_id}', session_id)
+                for league_id in leagues:
+                    pipe.srem(f'league_members:{league_id}', session_id)
+            _sync_presence(remove_presence)
             
-            logger.info(f"User {user_id} disconnected")
+            logger.info("User %s disconnected", user_id)
     
     except Exception as e:
-        logger.error(f"Disconnect error: {e}")
+        logger.error("Disconnect error: %s", e)
 
 @socketio.on('join_league')
 def handle_join_league(data):
     """Join a league room for real-time updates."""
     try:
         session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
@@ -85,16 +308,22 @@ def handle_join_league(data):
             emit('error', {'message': 'league_id required'})
             return
         
-        user_id = connected_users[session_id]['user_id']
-        
         # TODO: Verify user has access to league
         
         # Join league room
         join_room(f'league_{league_id}')
         
         # Add to user's league list
-        if league_id not in connected_users[session_id]['leagues']:
-            connected_users[session_id]['leagues'].append(league_id)
+        session['leagues'].add(league_id)
+        _update_presence(lambda presence: presence._replace(
+            league_sessions=_with_session(presence.league_sessions, league_id, session_id)
+        ))
+        
+        def add_member(pipe):
+            pipe.sadd(f'league_members:{league_id}', session_id)
+            pipe.expire(f'league_members:{league_id}', PRESENCE_TTL_SECONDS)
+        _sync_presence(add_member)
+        _refresh_presence(user_id)
         
         # Notify others in league
         emit('user_joined', {
@@ -103,10 +332,10 @@ def handle_join_league(data):
         }, room=f'league_{league_id}', include_self=False)
         
         emit('joined_league', {'league_id': league_id})
-        logger.info(f"User {user_id} joined league room {league_id}")
+        logger.info("User %s joined league room %s", user_id, league_id)
         
     except Exception as e:
-        logger.error(f"Join league error: {e}")
+        logger.error("Join league error: %s", e)
         emit('error', {'message': 'Failed to join league'})
 
 @socketio.on('leave_league')
@@ -114,21 +343,23 @@ def handle_leave_league(data):
     """Leave a league room."""
     try:
         session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             return
         
         league_id = data.get('league_id')
         if not league_id:
             return
         
-        user_id = connected_users[session_id]['user_id']
-        
         # Leave league room
         leave_room(f'league_{league_id}')
         
         # Remove from user's league list
-        if league_id in connected_users[session_id]['leagues']:
-            connected_users[session_id]['leagues'].remove(league_id)
+        session['leagues'].discard(league_id)
+        _update_presence(lambda presence: presence._replace(
+            league_sessions=_without_session(presence.league_sessions, league_id, session_id)
+        ))
+        _sync_presence(lambda pipe: pipe.srem(f'league_members:{league_id}', session_id))
         
         # Notify others in league
         emit('user_left', {
@@ -137,21 +368,63 @@ def handle_leave_league(data):
         }, room=f'league_{league_id}')
         
         emit('left_league', {'league_id': league_id})
-        logger.info(f"User {user_id} left league room {league_id}")
+        logger.info("User %s left league room %s", user_id, league_id)
+        
+    except Exception as e:
+        logger.error("Leave league error: %s", e)
+
+@socketio.on('join_trading_blocks')
+def handle_join_trading_blocks(data):
+    """Opt into trading block updates for a league."""
+    try:
+        user_id = session.get('user_id')
+        if user_id is None:
+            emit('error', {'message': 'Not authenticated'})
+            return
+        
+        _refresh_presence(user_id)
+        
+        league_id = data.get('league_id')
+        if not league_id:
+            emit('error', {'message': 'league_id required'})
+            return
+        
+        join_room(f'league_{league_id}:blocks')
+        emit('joined_trading_blocks', {'league_id': league_id})
         
     except Exception as e:
-        logger.error(f"Leave league error: {e}")
+        logger.error("Join trading blocks error: %s", e)
+        emit('error', {'message': 'Failed to join trading blocks'})
+
+@socketio.on('leave_trading_blocks')
+def handle_leave_trading_blocks(data):
+    """Opt out of trading block updates for a league."""
+    try:
+        user_id = session.get('user_id')
+        if user_id is None:
+            return
+        
+        league_id = data.get('league_id')
+        if not league_id:
+            return
+        
+        leave_room(f'league_{league_id}:blocks')
+        emit('left_trading_blocks', {'league_id': league_id})
+        
+    except Exception as e:
+        logger.error("Leave trading blocks error: %s", e)
 
 @socketio.on('draft_pick')
 def handle_draft_pick(data):
     """Handle draft pick selection."""
     try:
-        session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
-        user_id = connected_users[session_id]['user_id']
+        _refresh_presence(user_id)
+        
         league_id = data.get('league_id')
         player_id = data.get('player_id')
         pick_number = data.get('pick_number')
@@ -160,34 +433,41 @@ def handle_draft_pick(data):
             emit('error', {'message': 'Missing required fields'})
             return
         
+        if not _allow_event(user_id, 'draft_pick', *DRAFT_PICK_RATE_LIMIT):
+            emit('error', {'message': 'Rate limited'})
+            return
+        
         # TODO: Validate draft pick and process
         
         # Broadcast pick to league
-        pick_data = {
-            'league_id': league_id,
-            'player_id': player_id,
-            'pick_number': pick_number,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        emit('draft_pick_made', pick_data, room=f'league_{league_id}')
-        logger.info(f"Draft pick made: {pick_data}")
+        pick_data = pick_payloads.acquire(
+            league_id=league_id,
+            player_id=player_id,
+            pick_number=pick_number,
+            user_id=user_id,
+            timestamp=_event_timestamp()
+        )
+        try:
+            emit('draft_pick_made', pick_data, room=f'league_{league_id}')
+            logger.info("Draft pick made: %s", pick_data)
+        finally:
+            pick_payloads.release(pick_data)
         
     except Exception as e:
-        logger.error(f"Draft pick error: {e}")
+        logger.error("Draft pick error: %s", e)
         emit('error', {'message': 'Failed to process draft pick'})
 
 @socketio.on('chat_message')
 def handle_chat_message(data):
     """Handle chat message in league."""
     try:
-        session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
-        user_id = connected_users[session_id]['user_id']
+        _refresh_presence(user_id)
+        
         league_id = data.get('league_id')
         message = data.get('message', '').strip()
         
@@ -199,34 +479,39 @@ def handle_chat_message(data):
             emit('error', {'message': 'Message too long'})
             return
         
+        if not _allow_event(user_id, 'chat', *CHAT_RATE_LIMIT):
+            emit('error', {'message': 'Rate limited'})
+            return
+        
         # TODO: Store message in database and validate user access
         
         # Broadcast message to league
         message_data = {
-            'id': str(datetime.utcnow().timestamp()),
+            'id': secrets.token_hex(8),
             'league_id': league_id,
             'user_id': user_id,
             'message': message,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _event_timestamp()
         }
         
-        emit('chat_message', message_data, room=f'league_{league_id}')
-        logger.info(f"Chat message sent in league {league_id}")
+        _queue_chat_message(league_id, message_data)
+        logger.info("Chat message sent in league %s", league_id)
         
     except Exception as e:
-        logger.error(f"Chat message error: {e}")
+        logger.error("Chat message error: %s", e)
         emit('error', {'message': 'Failed to send message'})
 
 @socketio.on('trade_proposal')
 def handle_trade_proposal(data):
     """Handle trade proposal notification."""
     try:
-        session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
-        user_id = connected_users[session_id]['user_id']
+        _refresh_presence(user_id)
+        
         league_id = data.get('league_id')
         to_team_id = data.get('to_team_id')
         
@@ -237,30 +522,33 @@ def handle_trade_proposal(data):
         # TODO: Process trade proposal and validate
         
         # Broadcast to league
-        trade_data = {
-            'league_id': league_id,
-            'from_user_id': user_id,
-            'to_team_id': to_team_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        emit('trade_proposed', trade_data, room=f'league_{league_id}')
-        logger.info(f"Trade proposed in league {league_id}")
+        trade_data = trade_payloads.acquire(
+            league_id=league_id,
+            from_user_id=user_id,
+            to_team_id=to_team_id,
+            timestamp=_event_timestamp()
+        )
+        try:
+            emit('trade_proposed', trade_data, room=f'league_{league_id}')
+            logger.info("Trade proposed in league %s", league_id)
+        finally:
+            trade_payloads.release(trade_data)
         
     except Exception as e:
-        logger.error(f"Trade proposal error: {e}")
+        logger.error("Trade proposal error: %s", e)
         emit('error', {'message': 'Failed to process trade proposal'})
 
 @socketio.on('waiver_claim')
 def handle_waiver_claim(data):
     """Handle waiver claim notification."""
     try:
-        session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
-        user_id = connected_users[session_id]['user_id']
+        _refresh_presence(user_id)
+        
         league_id = data.get('league_id')
         player_id = data.get('player_id')
         bid_amount = data.get('bid_amount')
@@ -272,30 +560,33 @@ def handle_waiver_claim(data):
         # TODO: Process waiver claim and validate
         
         # Broadcast to league (without showing bid amount to others)
-        claim_data = {
-            'league_id': league_id,
-            'user_id': user_id,
-            'player_id': player_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        emit('waiver_claim_made', claim_data, room=f'league_{league_id}')
-        logger.info(f"Waiver claim made in league {league_id}")
+        claim_data = claim_payloads.acquire(
+            league_id=league_id,
+            user_id=user_id,
+            player_id=player_id,
+            timestamp=_event_timestamp()
+        )
+        try:
+            emit('waiver_claim_made', claim_data, room=f'league_{league_id}')
+            logger.info("Waiver claim made in league %s", league_id)
+        finally:
+            claim_payloads.release(claim_data)
         
     except Exception as e:
-        logger.error(f"Waiver claim error: {e}")
+        logger.error("Waiver claim error: %s", e)
         emit('error', {'message': 'Failed to process waiver claim'})
 
 @socketio.on('lineup_update')
 def handle_lineup_update(data):
     """Handle lineup update notification."""
     try:
-        session_id = request.sid
-        if session_id not in connected_users:
+        user_id = session.get('user_id')
+        if user_id is None:
             emit('error', {'message': 'Not authenticated'})
             return
         
-        user_id = connected_users[session_id]['user_id']
+        _refresh_presence(user_id)
+        
         league_id = data.get('league_id')
         team_id = data.get('team_id')
         
@@ -306,54 +597,89 @@ def handle_lineup_update(data):
         # TODO: Validate lineup update
         
         # Broadcast to league
-        update_data = {
-            'league_id': league_id,
-            'team_id': team_id,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        emit('lineup_updated', update_data, room=f'league_{league_id}')
-        logger.info(f"Lineup updated in league {league_id}")
+        update_data = lineup_payloads.acquire(
+            league_id=league_id,
+            team_id=team_id,
+            user_id=user_id,
+            timestamp=_event_timestamp()
+        )
+        try:
+            emit('lineup_updated', update_data, room=f'league_{league_id}')
+            logger.info("Lineup updated in league %s", league_id)
+        finally:
+            lineup_payloads.release(update_data)
         
     except Exception as e:
-        logger.error(f"Lineup update error: {e}")
+        logger.error("Lineup update error: %s", e)
         emit('error', {'message': 'Failed to process lineup update'})
 
 # Utility functions for emitting events
+def _league_room_empty(league_id: str) -> bool:
+    """Check whether no session on any worker has joined the league's room."""
+    if presence_store is not None:
+        try:
+            return presence_store.scard(f'league_members:{league_id}') == 0
+        except redis.RedisError as e:
+            logger.error("Failed to check league members for %s: %s", league_id, e)
+            return False
+    
+    return not socketio.server.manager.rooms.get('/', {}).get(f'league_{league_id}')
+
 def broadcast_to_league(league_id: str, event: str, data: dict):
     """Broadcast event to all users in a league."""
     try:
+        # Idle leagues skip packet encoding and the fan-out entirely
+        if _league_room_empty(league_id):
+            logger.debug("Skipped %s for empty league %s", event, league_id)
+            return
+        
         socketio.emit(event, data, room=f'league_{league_id}')
-        logger.debug(f"Broadcasted {event} to league {league_id}")
+        logger.debug("Broadcasted %s to league %s", event, league_id)
     except Exception as e:
-        logger.error(f"Failed to broadcast to league {league_id}: {e}")
+        logger.error("Failed to broadcast to league %s: %s", league_id, e)
 
 def send_to_user(user_id: str, event: str, data: dict):
     """Send event to a specific user if connected."""
     try:
-        # Find user's session
-        for session_id, user_info in connected_users.items():
-            if user_info['user_id'] == user_id:
-                socketio.emit(event, data, room=session_id)
-                logger.debug(f"Sent {event} to user {user_id}")
-                return True
-        
-        logger.debug(f"User {user_id} not connected for event {event}")
-        return False
+        # Deliver to every session the user has open, on any worker
+        if presence_store is not None:
+            sessions = _live_sessions(f'user_sessions:{user_id}')
+        else:
+            sessions = _presence.user_sessions.get(user_id)
+        if not sessions:
+            logger.debug("User %s not connected for event %s", user_id, event)
+            return False
+        
+        for session_id in sessions:
+            socketio.emit(event, data, room=session_id)
+        logger.debug("Sent %s to user %s", event, user_id)
+        return True
         
     except Exception as e:
-        logger.error(f"Failed to send to user {user_id}: {e}")
+        logger.error("Failed to send to user %s: %s", user_id, e)
         return False
 
 def get_connected_users_in_league(league_id: str):
     """Get list of connected users in a league."""
     try:
-        users = []
-        for session_id, user_info in connected_users.items():
-            if league_id in user_info.get('leagues', []):
-                users.append(user_info['user_id'])
-        return users
+        if presence_store is not None:
+            # Sessions whose presence key expired are skipped and pruned
+            members_key = f'league_members:{league_id}'
+            session_ids = list(presence_store.smembers(members_key))
+            pipe = presence_store.pipeline()
+            for session_id in session_ids:
+                pipe.hget(f'presence:{session_id}', 'user_id')
+            user_ids = pipe.execute()
+            
+            stale = [session_id for session_id, user_id in zip(session_ids, user_ids) if not user_id]
+            if stale:
+                presence_store.srem(members_key, *stale)
+            return [user_id for user_id in user_ids if user_id]
+        
+        presence = _presence
+        return [presence.session_users[session_id]
+                for session_id in presence.league_sessions.get(league_id, ())
+                if session_id in presence.session_users]
     except Exception as e:
-        logger.error(f"Failed to get connected users for league {league_id}: {e}")
+        logger.error("Failed to get connected users for league %s: %s", league_id, e)
         return []
\ No newline at end of file
@@ -1,51 +1,204 @@
 """
 External API integration utilities for the OneFantasy application.
 """
-import requests
+import asyncio
+import httpx
+import orjson
+import redis
 import time
+from bisect import bisect_right
+from collections import defaultdict
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
+from ..config import Config
 from ..utils.logger import get_logger
 
 logger = get_logger('api_integrations')
 
+# Cross-worker response cache; without it each worker keeps its own copy
+# and hits the FPL API independently
+FETCH_LOCK_TIMEOUT_MS = 15000
+FETCH_LOCK_WAIT_SECONDS = 5
+FETCH_LOCK_POLL_SECONDS = 0.1
+shared_cache = (redis.Redis.from_url(Config.FPL_CACHE_REDIS_URL, decode_responses=True)
+                if Config.FPL_CACHE_REDIS_URL else None)
+
+# One pooled HTTP/2 client shared by every API client in the process, so
+# connections (and their TLS handshakes) are reused across requests
+http_client = httpx.Client(
+    http2=True,
+    timeout=10,
+    headers={'User-Agent': 'OneFantasy/1.0'},
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+)
+
 class FPLAPIClient:
     """Client for Fantasy Premier League API."""
     
     def __init__(self):
         self.base_url = 'https://fantasy.premierleague.com/api'
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'OneFantasy/1.0'
-        })
+        self.session = http_client
         self._cache = {}
         self._cache_timeout = 3600  # 1 hour
+        self._search_index = None
+        self._search_index_timestamp = None
+        self._bootstrap_indexes = None
+        self._bootstrap_indexes_timestamp = None
     
-    def _get_cached_or_fetch(self, key: str, url: str, params: Dict = None) -> Optional[Dict]:
-        """Get data from cache or fetch from API."""
-        now = time.time()
+    def _get_cached(self, key: str, now: float) -> Optional[Dict]:
+        """
+        Get a cached response, checking this process first and then the shared cache.
         
-        # Check cache
+        Shared hits are kept locally with their original fetch time so the
+        local copy expires together with the shared one.
+        """
         if key in self._cache:
             cached_data, timestamp = self._cache[key]
             if now - timestamp < self._cache_timeout:
                 logger.debug(f"Returning cached data for {key}")
                 return cached_data
         
+        if shared_cache is None:
+            return None
+        
+        try:
+            raw = shared_cache.get(f'fpl:{key}')
+        except redis.RedisError as e:
+            logger.error(f"Failed to read shared FPL cache for {key}: {e}")
+            return None
+        if raw is None:
+            return None
+        
+        entry = orjson.loads(raw)
+        self._cache[key] = (entry['data'], entry['fetched_at'])
+        logger.debug(f"Returning shared cached data for {key}")
+        return entry['data']
+    
+    def _set_cached(self, key: str, data: Dict, now: float):
+        """Store a fetched response locally and, if configured, in the shared cache."""
+        self._cache[key] = (data, now)
+        
+        if shared_cache is None:
+            return
+        
+        try:
+            shared_cache.setex(f'fpl:{key}', self._cache_timeout,
+                               orjson.dumps({'data': data, 'fetched_at': now}))
+        except redis.RedisError as e:
+            logger.error(f"Failed to write shared FPL cache for {key}: {e}")
+    
+    def _acquire_fetch_lock(self, key: str) -> bool:
+        """
+        Claim the right to fetch a key from the FPL API across workers.
+        
+        Returns True when this worker should fetch. Otherwise another worker
+        is already fetching; wait for its result to reach the shared cache.
+        """
+        if shared_cache is None:
+            return True
+        
+        try:
+            return bool(shared_cache.set(f'fpl:lock:{key}', 1, nx=True, px=FETCH_LOCK_TIMEOUT_MS))
+        except redis.RedisError as e:
+            logger.error(f"Failed to acquire FPL fetch lock for {key}: {e}")
+            return True
+    
+    def _release_fetch_lock(self, key: str):
+        """Release a fetch lock taken by _acquire_fetch_lock."""
+        if shared_cache is None:
+            return
+        
+        try:
+            shared_cache.delete(f'fpl:lock:{key}')
+        except redis.RedisError as e:
+            logger.error(f"Failed to release FPL fetch lock for {key}: {e}")
+    
+    def _get_cached_or_fetch(self, key: str, url: str, params: Dict = None) -> Optional[Dict]:
+        """Get data from cache or fetch from API."""
+        now = time.time()
+        
+        # Check cache
+        cached_data = self._get_cached(key, now)
+        if cached_data is not None:
+            return cached_data
+        
+        # Another worker is fetching this key; wait for it instead of
+        # sending a duplicate request, then fall back to fetching ourselves
+        locked = self._acquire_fetch_lock(key)
+        if not locked:
+            deadline = now + FETCH_LOCK_WAIT_SECONDS
+            while time.time() < deadline:
+                time.sleep(FETCH_LOCK_POLL_SECONDS)
+                cached_data = self._get_cached(key, time.time())
+                if cached_data is not None:
+                    return cached_data
+            logger.warning(f"Timed out waiting for shared FPL fetch of {key}")
+        
         # Fetch from API
         try:
             logger.info(f"Fetching data from FPL API: {url}")
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            self._cache[key] = (data, now)
+            data = orjson.loads(response.content)
+            self._set_cached(key, data, now)
             
             return data
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Failed to fetch data from {url}: {e}")
             return None
+        finally:
+            if locked:
+                self._release_fetch_lock(key)
+    
+    async def _get_cached_or_fetch_async(self, client: httpx.AsyncClient, key: str, url: str,
+                                         params: Dict = None) -> Optional[Dict]:
+        """Async variant of _get_cached_or_fetch sharing the same cache."""
+        now = time.time()
+        
+        # Check cache
+        cached_data = self._get_cached(key, now)
+        if cached_data is not None:
+            return cached_data
+        
+        # Fetch from API
+        try:
+            logger.info(f"Fetching data from FPL API: {url}")
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            self._set_cached(key, data, now)
+            
+            return data
+            
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error(f"Failed to fetch data from {url}: {e}")
+            return None
+    
+    async def get_players_bulk_async(self, player_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get detailed data for several players concurrently over one HTTP/2 connection."""
+        async with httpx.AsyncClient(http2=True, timeout=10,
+                                     headers={'User-Agent': 'OneFantasy/1.0'}) as client:
+            results = await asyncio.gather(*(
+                self._get_cached_or_fetch_async(
+                    client, f'player_{player_id}', f"{self.base_url}/element-summary/{player_id}/"
+                )
+                for player_id in player_ids
+            ))
+        return dict(zip(player_ids, results))
+    
+    def get_players_bulk(self, player_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """
+        Get detailed data for several players, fetching uncached players in parallel.
+        
+        Sync entry point for callers outside an event loop.
+        
+        Returns:
+            Dict of player ID to element summary (None where the fetch failed)
+        """
+        return asyncio.run(self.get_players_bulk_async(player_ids))
     
     def get_bootstrap_data(self) -> Optional[Dict]:
         """Get bootstrap static data including players, teams, and game settings."""
@@ -104,6 +257,97 @@ class FPLAPIClient:
         url = f"{self.base_url}/event/{gameweek}/live/"
         return self._get_cached_or_fetch(f'live_{gameweek}', url)
     
+    def _get_bootstrap_indexes(self) -> Optional[Dict[str, Dict[int, Dict]]]:
+        """
+        Get id -> record lookups for players, teams and positions, rebuilt on bootstrap refresh.
+        
+        Also holds each player's photo URL, built once per refresh.
+        """
+        bootstrap = self.get_bootstrap_data()
+        if not bootstrap:
+            return None
+        
+        timestamp = self._cache['bootstrap'][1]
+        if self._bootstrap_indexes is None or self._bootstrap_indexes_timestamp != timestamp:
+            elements = bootstrap.get('elements', [])
+            self._bootstrap_indexes = {
+                'players': {p['id']: p for p in elements},
+                'photo_urls': {
+                    p['id']: (f"https://resources.premierleague.com/premierleague/photos/players/250x250/p{p['photo'].replace('.jpg', '.png')}"
+                              if p.get('photo') else None)
+                    for p in elements
+                },
+                'teams': {t['id']: t for t in bootstrap.get('teams', [])},
+                'types': {et['id']: et for et in bootstrap.get('element_types', [])}
+            }
+            self._bootstrap_indexes_timestamp = timestamp
+        
+        return self._bootstrap_indexes
+    
+    def _get_search_index(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the player search index, rebuilding it when the bootstrap data is refreshed.
+        
+        The index holds each player's lowercased search name plus position and
+        team postings lists (player indexes in bootstrap order).
+        """
+        players = self.get_players()
+        if not players:
+            return None
+        
+        timestamp = self._cache['bootstrap'][1]
+        if self._search_index is None or self._search_index_timestamp != timestamp:
+            by_position = defaultdict(list)
+            by_team = defaultdict(list)
+            for i, player in enumerate(players):
+                by_position[player.get('element_type')].append(i)
+                by_team[player.get('team')].append(i)
+            
+            names = [(player.get('web_name', '') + ' ' +
+                      player.get('first_name', '') + ' ' +
+                      player.get('second_name', '')).lower() for player in players]
+            
+            # All names in one newline-separated string, with each name's
+            # start offset, so a query is matched by a single C-level scan
+            name_offsets = []
+            offset = 0
+            for name in names:
+                name_offsets.append(offset)
+                offset += len(name) + 1
+            
+            self._search_index = {
+                'players': players,
+                'names': names,
+                'name_corpus': '\n'.join(names),
+                'name_offsets': name_offsets,
+                'by_position': dict(by_position),
+                'by_team': dict(by_team)
+            }
+            self._search_index_timestamp = timestamp
+        
+        return self._search_index
+    
+    @staticmethod
+    def _match_player_names(index: Dict[str, Any], query: str) -> set:
+        """Get the indexes of players whose search name contains the lowercased query."""
+        if '\n' in query:
+            return set()
+        
+        corpus = index['name_corpus']
+        offsets = index['name_offsets']
+        matches = set()
+        pos = corpus.find(query)
+        while pos != -1:
+            i = bisect_right(offsets, pos) - 1
+            matches.add(i)
+            
+            # Resume at the next name; one hit per player is enough
+            if i + 1 >= len(offsets):
+                break
+            pos = corpus.find(query, offsets[i + 1])
+        
+        return matches
+    
     def search_players(self, query: str, position: Optional[str] = None, 
                       team: Optional[int] = None, limit: int = 50) -> List[Dict]:
         """
@@ -118,33 +362,39 @@ class FPLAPIClient:
         Returns:
             List of matching players
         """
-        players = self.get_players()
-        if not players:
+        index = self._get_search_index()
+        if not index:
             return []
         
         # Position mapping
         position_map = {'GK': 1, 'DEF': 2, 'MID': 3, 'FWD': 4}
         position_id = position_map.get(position) if position else None
         
+        # Narrow candidates with the position and team postings
+        if position_id and team:
+            team_members = set(index['by_team'].get(team, ()))
+            candidates = [i for i in index['by_position'].get(position_id, ()) if i in team_members]
+        elif position_id:
+            candidates = index['by_position'].get(position_id, ())
+        elif team:
+            candidates = index['by_team'].get(team, ())
+        else:
+            candidates = range(len(index['players']))
+        
         results = []
-        query_lower = query.lower() if query else ''
+        players = index['players']
+        matches = self._match_player_names(index, query.lower()) if query else None
         
-        for player in players:
-            # Name filter
-            if query and query_lower not in (player.get('web_name', '') + ' ' + 
-                                           player.get('first_name', '') + ' ' + 
-                                           player.get('second_name', '')).lower():
-                continue
-            
-            # Position filter
-            if position_id and player.get('element_type') != position_id:
-                continue
-            
-            # Team filter
-            if team and player.get('team') != team:
+        if matches is not None and not (position_id or team):
+            candidates = sorted(matches)
+            matches = None
+        
+        for i in candidates:
+            # Name filter against the precomputed search names
+            if matches is not None and i not in matches:
                 continue
             
-            results.append(player)
+            results.append(players[i])
             
             if len(results) >= limit:
                 break
@@ -159,25 +409,20 @@ class FPLAPIClient:
             Dict with player stats including form, points, etc.
         """
         player_data = self.get_player_data(player_id)
-        bootstrap = self.get_bootstrap_data()
+        indexes = self._get_bootstrap_indexes()
         
-        if not bootstrap:
+        if not indexes:
             return {}
         
         # Find player in bootstrap data
-        players = bootstrap.get('elements', [])
-        player_info = next((p for p in players if p['id'] == player_id), None)
+        player_info = indexes['players'].get(player_id)
         
         if not player_info:
             return {}
         
-        # Get team info
-        teams = bootstrap.get('teams', [])
-        team_info = next((t for t in teams if t['id'] == player_info['team']), None)
-        
-        # Get position info
-        element_types = bootstrap.get('element_types', [])
-        position_info = next((et for et in element_types if et['id'] == player_info['element_type']), None)
+        # Get team and position info
+        team_info = indexes['teams'].get(player_info['team'])
+        position_info = indexes['types'].get(player_info['element_type'])
         
         stats = {
             'id': player_info['id'],
@@ -209,7 +454,7 @@ class FPLAPIClient:
             'ict_index': player_info['ict_index'],
             'status': player_info['status'],
             'news': player_info['news'],
-            'photo': f"https://resources.premierleague.com/premierleague/photos/players/250x250/p{player_info['photo'].replace('.jpg', '.png')}" if player_info.get('photo') else None
+            'photo': indexes['photo_urls'][player_id]
         }
         
         # Add detailed fixture and history data if available
@@ -228,12 +473,8 @@ class NewsAPIClient:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
         self.base_url = 'https://newsapi.org/v2'
-        self.session = requests.Session()
-        
-        if api_key:
-            self.session.headers.update({
-                'X-API-Key': api_key
-            })
+        self.session = http_client
+        self.headers = {'X-API-Key': api_key} if api_key else {}
     
     def get_premier_league_news(self, limit: int = 10) -> List[Dict]:
         """Get latest Premier League news."""
@@ -250,13 +491,13 @@ class NewsAPIClient:
                 'pageSize': limit
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
             return data.get('articles', [])
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"Failed to fetch news: {e}")
             return []
     
@@ -274,13 +515,13 @@ class NewsAPIClient:
                 'pageSize': limit
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
             return data.get('articles', [])
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"Failed to fetch player news for {player_name}: {e}")
             return []
 
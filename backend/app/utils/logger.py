@@ -1,16 +1,41 @@
 """
 Logging configuration for the OneFantasy application.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+from datetime import datetime, timezone
 from typing import Optional
+import orjson
 
-def setup_logger(level: str = 'INFO') -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+def setup_logger(level: str = 'INFO', log_format: str = 'text') -> logging.Logger:
     """
     Setup application logger with consistent formatting.
     
+    Records are handed to a queue and written by a background listener
+    thread, so logging calls never block on stdout.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_format: 'json' for one JSON object per line, otherwise plain text
         
     Returns:
         Configured logger instance
@@ -31,14 +56,23 @@ def setup_logger(level: str = 'INFO') -> logging.Logger:
     handler.setLevel(numeric_level)
     
     # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if log_format == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     handler.setFormatter(formatter)
     
+    # Route records through a queue; the listener thread does the I/O
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     # Add handler to logger
-    logger.addHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     # Prevent propagation to root logger
     logger.propagate = False
@@ -0,0 +1,21 @@
+"""
+JSON serialization helpers for the OneFantasy application.
+"""
+import orjson
+
+class OrjsonModule:
+    """
+    orjson adapter exposing the json-module interface SocketIO expects.
+    
+    SocketIO passes stdlib keyword arguments such as separators, which
+    orjson does not accept; its output is already compact, so they are
+    dropped. dumps returns str because packets are sent as text frames.
+    """
+    
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
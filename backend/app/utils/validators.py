@@ -1,31 +1,77 @@
 """
 Input validation utilities for the OneFantasy application.
 """
-import re
-from typing import Any, Dict, List, Optional, Union
-from functools import wraps
+import string
+from itertools import chain
+from typing import Any, Callable, Dict, Final, FrozenSet, List, Optional, Tuple, Union, cast
+from functools import lru_cache, wraps
 from flask import request, jsonify
 
+# Deletes every name character except whitespace; what remains must be blank
+_NAME_DELETE_TABLE: Final[Dict[int, Optional[int]]] = str.maketrans('', '', string.ascii_letters + string.digits + '-_')
+
+_VALID_POSITIONS: Final[FrozenSet[str]] = frozenset({'GK', 'DEF', 'MID', 'FWD'})
+
+# Lineups longer than this check ids with C-level set builds instead of a loop
+_LINEUP_SCAN_THRESHOLD: Final = 32
+_INT_ONLY: Final[FrozenSet[type]] = frozenset({int})
+
+# Characters allowed on each side of an email's '@'
+_EMAIL_LOCAL_CHARS: Final[FrozenSet[str]] = frozenset(string.ascii_letters + string.digits + '._%+-')
+_EMAIL_DOMAIN_CHARS: Final[FrozenSet[str]] = frozenset(string.ascii_letters + string.digits + '.-')
+
+@lru_cache(maxsize=1024)
 def validate_email(email: str) -> bool:
-    """Validate email format."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    """
+    Validate email format.
+    
+    Accepts local@domain.tld where the local part uses letters, digits and
+    ._%+-, the domain uses letters, digits, '.' and '-', and the TLD is at
+    least two letters. Scans the address once, without regex backtracking.
+    """
+    at = email.rfind('@')
+    if at <= 0:
+        return False
+    local, domain = email[:at], email[at + 1:]
+    
+    dot = domain.rfind('.')
+    if dot <= 0:
+        return False
+    tld = domain[dot + 1:]
+    
+    return (
+        len(tld) >= 2 and tld.isascii() and tld.isalpha() and
+        _EMAIL_LOCAL_CHARS.issuperset(local) and
+        _EMAIL_DOMAIN_CHARS.issuperset(domain[:dot])
+    )
 
 def validate_league_name(name: str) -> bool:
     """Validate league name."""
-    return (
-        isinstance(name, str) and 
-        3 <= len(name.strip()) <= 50 and
-        re.match(r'^[a-zA-Z0-9\s\-_]+$', name.strip())
-    )
+    return isinstance(name, str) and _is_valid_league_name(name)
+
+def _has_name_chars_only(name: str) -> bool:
+    """
+    Check that a name only uses letters, digits, whitespace, '-' and '_'.
+    
+    Uses str.translate rather than a regex, so the league and team name
+    validators return a plain bool instead of a Match object.
+    """
+    rest = name.translate(_NAME_DELETE_TABLE)
+    return not rest or rest.isspace()
+
+@lru_cache(maxsize=1024)
+def _is_valid_league_name(name: str) -> bool:
+    stripped = name.strip()
+    return 3 <= len(stripped) <= 50 and _has_name_chars_only(stripped)
 
 def validate_team_name(name: str) -> bool:
     """Validate team name."""
-    return (
-        isinstance(name, str) and 
-        2 <= len(name.strip()) <= 30 and
-        re.match(r'^[a-zA-Z0-9\s\-_]+$', name.strip())
-    )
+    return isinstance(name, str) and _is_valid_team_name(name)
+
+@lru_cache(maxsize=1024)
+def _is_valid_team_name(name: str) -> bool:
+    stripped = name.strip()
+    return 2 <= len(stripped) <= 30 and _has_name_chars_only(stripped)
 
 def validate_league_size(size: int) -> bool:
     """Validate league size."""
@@ -37,6 +83,13 @@ def validate_pick_time(seconds: int) -> bool:
 
 def validate_waiver_bid(bid: Union[int, float]) -> bool:
     """Validate waiver bid amount."""
+    # Numeric bids (the usual case) skip conversion and exception handling
+    bid_type = type(bid)
+    if bid_type is int or bid_type is float:
+        return 0 <= bid <= 100
+    if bid_type is bool:
+        return False
+    
     try:
         bid_amount = float(bid)
         return 0 <= bid_amount <= 100
@@ -45,8 +98,7 @@ def validate_waiver_bid(bid: Union[int, float]) -> bool:
 
 def validate_player_position(position: str) -> bool:
     """Validate player position."""
-    valid_positions = ['GK', 'DEF', 'MID', 'FWD']
-    return position in valid_positions
+    return position in _VALID_POSITIONS
 
 def validate_draft_pick(pick_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -57,17 +109,20 @@ def validate_draft_pick(pick_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     errors = []
     
-    if not isinstance(pick_data.get('player_id'), int):
+    if type(pick_data.get('player_id')) is not int:
         errors.append('player_id must be an integer')
     
     if not isinstance(pick_data.get('team_id'), str) or not pick_data['team_id'].strip():
         errors.append('team_id must be a non-empty string')
     
-    if not isinstance(pick_data.get('pick_number'), int) or pick_data['pick_number'] < 1:
+    if type(pick_data.get('pick_number')) is not int or pick_data['pick_number'] < 1:
         errors.append('pick_number must be a positive integer')
     
+    if not errors:
+        return {'valid': True, 'errors': []}
+    
     return {
-        'valid': len(errors) == 0,
+        'valid': False,
         'errors': errors
     }
 
@@ -94,17 +149,23 @@ def validate_trade_proposal(trade_data: Dict[str, Any]) -> Dict[str, Any]:
         errors.append('to_team_id must be a string')
     
     # Validate player lists
-    for field in ['from_players', 'to_players']:
+    for field in ('from_players', 'to_players'):
         players = trade_data.get(field, [])
         if not isinstance(players, list):
             errors.append(f'{field} must be a list')
         elif not players:
             errors.append(f'{field} cannot be empty')
-        elif not all(isinstance(p, int) for p in players):
-            errors.append(f'All items in {field} must be integers')
+        else:
+            for p in players:
+                if type(p) is not int:
+                    errors.append(f'All items in {field} must be integers')
+                    break
+    
+    if not errors:
+        return {'valid': True, 'errors': []}
     
     return {
-        'valid': len(errors) == 0,
+        'valid': False,
         'errors': errors
     }
 
@@ -112,6 +173,10 @@ def validate_lineup(lineup_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate lineup data.
     
+    There is deliberately no bulk variant: nothing imports lineups in bulk, and
+    a lineup is at most a few dozen IDs, so callers with many lineups should
+    simply call this per lineup.
+    
     Returns:
         Dict with 'valid' boolean and 'errors' list
     """
@@ -123,28 +188,56 @@ def validate_lineup(lineup_data: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(lineup_data.get('bench'), list):
         errors.append('bench must be a list')
     
-    starters = lineup_data.get('starters', [])
-    bench = lineup_data.get('bench', [])
+    # The remaining checks need both lists
+    if errors:
+        return {
+            'valid': False,
+            'errors': errors
+        }
+    
+    starters = lineup_data['starters']
+    bench = lineup_data['bench']
+    
+    total = len(starters) + len(bench)
+    if total > _LINEUP_SCAN_THRESHOLD and _INT_ONLY.issuperset(map(type, chain(starters, bench))):
+        # Large all-int lineups: duplicates fall out of the set size
+        invalid_type = False
+        duplicate = len(set(chain(starters, bench))) != total
+    else:
+        # Check player ID types and duplicates in one pass
+        seen = set()
+        invalid_type = False
+        duplicate = False
+        for player_id in chain(starters, bench):
+            if type(player_id) is not int:
+                invalid_type = True
+            elif player_id in seen:
+                duplicate = True
+            else:
+                seen.add(player_id)
     
-    # Check for valid player IDs
-    all_players = starters + bench
-    if not all(isinstance(p, int) for p in all_players):
+    if invalid_type:
         errors.append('All player IDs must be integers')
     
-    # Check for duplicates
-    if len(all_players) != len(set(all_players)):
+    if duplicate:
         errors.append('Duplicate players found in lineup')
     
     # Check lineup size (11 starters + bench)
     if len(starters) != 11:
         errors.append('Must have exactly 11 starters')
     
+    if not errors:
+        return {'valid': True, 'errors': []}
+    
     return {
-        'valid': len(errors) == 0,
+        'valid': False,
         'errors': errors
     }
 
-def validate_json_request(required_fields: List[str] = None, optional_fields: List[str] = None):
+def validate_json_request(
+        required_fields: Optional[List[str]] = None,
+        optional_fields: Optional[List[str]] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """
     Decorator to validate JSON request data.
     
@@ -152,9 +245,19 @@ def validate_json_request(required_fields: List[str] = None, optional_fields: Li
         required_fields: List of required field names
         optional_fields: List of optional field names
     """
-    def decorator(f):
+    return _json_request_validator(tuple(required_fields or ()), tuple(optional_fields or ()))
+
+@lru_cache(maxsize=None)
+def _json_request_validator(required: Tuple[str, ...],
+                            optional: Tuple[str, ...]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Build the validate_json_request decorator once per field shape."""
+    # Field sets are fixed per shape, so build them once here
+    required_set = frozenset(required)
+    allowed_fields = frozenset(required + optional)
+    
+    def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(f)
-        def decorated_function(*args, **kwargs):
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
             if not request.is_json:
                 return jsonify({'error': 'Content-Type must be application/json'}), 400
             
@@ -162,18 +265,15 @@ def validate_json_request(required_fields: List[str] = None, optional_fields: Li
             if not data:
                 return jsonify({'error': 'Invalid JSON data'}), 400
             
-            errors = []
+            errors: List[str] = []
             
-            # Check required fields
-            if required_fields:
-                for field in required_fields:
-                    if field not in data:
-                        errors.append(f'{field} is required')
+            # Check required fields; the ordered scan only runs when some are missing
+            if not required_set.issubset(data):
+                errors.extend(f'{field} is required' for field in required if field not in data)
             
             # Check for unexpected fields
-            allowed_fields = set((required_fields or []) + (optional_fields or []))
             if allowed_fields:
-                unexpected = set(data.keys()) - allowed_fields
+                unexpected = data.keys() - allowed_fields
                 if unexpected:
                     errors.append(f'Unexpected fields: {", ".join(unexpected)}')
             
@@ -184,7 +284,7 @@ def validate_json_request(required_fields: List[str] = None, optional_fields: Li
         return decorated_function
     return decorator
 
-def sanitize_string(value: str, max_length: int = None) -> str:
+def sanitize_string(value: str, max_length: Optional[int] = None) -> str:
     """
     Sanitize string input by trimming whitespace and limiting length.
     
@@ -198,6 +298,11 @@ def sanitize_string(value: str, max_length: int = None) -> str:
     if not isinstance(value, str):
         return str(value)
     
+    # Already trimmed and within bounds: return it without copying
+    if (not value or not (value[0].isspace() or value[-1].isspace())) and \
+            (not max_length or len(value) <= max_length):
+        return value
+    
     sanitized = value.strip()
     
     if max_length and len(sanitized) > max_length:
@@ -205,6 +310,30 @@ def sanitize_string(value: str, max_length: int = None) -> str:
     
     return sanitized
 
+def _parse_int_param(value: Any, default: int) -> Optional[int]:
+    """
+    Parse an integer query parameter.
+    
+    Plain digit strings and ints, the usual query-string shapes, skip the
+    exception handling that other inputs fall back to.
+    
+    Returns:
+        The parsed value, the default if the value is empty, or None if it is not an integer
+    """
+    if not value:
+        return default
+    
+    value_type = type(value)
+    if value_type is int:
+        return cast(int, value)
+    if value_type is str and value.isascii() and value.isdigit():
+        return int(value)
+    
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
 def validate_pagination_params(page: Any, per_page: Any) -> Dict[str, Union[int, List[str]]]:
     """
     Validate pagination parameters.
@@ -214,21 +343,19 @@ def validate_pagination_params(page: Any, per_page: Any) -> Dict[str, Union[int,
     """
     errors = []
     
-    try:
-        page = int(page) if page else 1
-        if page < 1:
-            errors.append('page must be >= 1')
-    except (ValueError, TypeError):
+    page = _parse_int_param(page, 1)
+    if page is None:
         errors.append('page must be an integer')
         page = 1
+    elif page < 1:
+        errors.append('page must be >= 1')
     
-    try:
-        per_page = int(per_page) if per_page else 20
-        if per_page < 1 or per_page > 100:
-            errors.append('per_page must be between 1 and 100')
-    except (ValueError, TypeError):
+    per_page = _parse_int_param(per_page, 20)
+    if per_page is None:
         errors.append('per_page must be an integer')
         per_page = 20
+    elif per_page < 1 or per_page > 100:
+        errors.append('per_page must be between 1 and 100')
     
     return {
         'page': page,
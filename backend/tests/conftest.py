@@ -0,0 +1,180 @@
+"""
+Shared test setup.
+
+app/__init__.py connects to Firebase and registers routes at import time, so
+the tests build the package namespace themselves and point get_db at an
+in-memory Firestore stand-in. Only the document operations the services
+under test use are implemented.
+"""
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from flask_socketio import SocketIO
+
+APP_DIR = Path(__file__).resolve().parents[1] / 'app'
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+    
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+    
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeQuery:
+    _OPS = {
+        '==': lambda value, target: value == target,
+        'in': lambda value, target: value in target,
+        '<': lambda value, target: value is not None and value < target,
+    }
+    
+    def __init__(self, db, path, filters=(), fields=None, limit=None):
+        self._db = db
+        self._path = path
+        self._filters = tuple(filters)
+        self._fields = fields
+        self._limit = limit
+    
+    def where(self, field, op, value):
+        return FakeQuery(self._db, self._path, self._filters + ((field, op, value),),
+                         self._fields, self._limit)
+    
+    def select(self, fields):
+        return FakeQuery(self._db, self._path, self._filters, list(fields), self._limit)
+    
+    def order_by(self, *args, **kwargs):
+        return self
+    
+    def limit(self, count):
+        return FakeQuery(self._db, self._path, self._filters, self._fields, count)
+    
+    def stream(self):
+        prefix = self._path + '/'
+        results = []
+        for path, data in list(self._db.store.items()):
+            if not path.startswith(prefix) or '/' in path[len(prefix):]:
+                continue
+            if not all(self._OPS[op](data.get(field), value) for field, op, value in self._filters):
+                continue
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            results.append(FakeSnapshot(FakeDocument(self._db, path), data))
+            if self._limit is not None and len(results) >= self._limit:
+                break
+        return iter(results)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, path):
+        super().__init__(db, path)
+    
+    def document(self, doc_id=None):
+        return FakeDocument(self._db, f'{self._path}/{doc_id or self._db.new_id()}')
+
+
+class FakeDocument:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[1]
+    
+    def collection(self, name):
+        return FakeCollection(self._db, f'{self.path}/{name}')
+    
+    def get(self, transaction=None):
+        return FakeSnapshot(self, self._db.store.get(self.path))
+    
+    def set(self, data):
+        self._db.store[self.path] = dict(data)
+    
+    def update(self, data):
+        self._db.store.setdefault(self.path, {}).update(data)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self.writes = []
+    
+    def set(self, ref, data):
+        self.writes.append(('set', ref.path, data))
+    
+    def update(self, ref, data):
+        self.writes.append(('update', ref.path, data))
+    
+    def commit(self):
+        for kind, path, data in self.writes:
+            if kind == 'set':
+                self._db.store[path] = dict(data)
+            else:
+                self._db.store.setdefault(path, {}).update(data)
+        self._db.commits.append(list(self.writes))
+
+
+class FakeFirestore:
+    """Dict-backed stand-in keyed by document path, e.g. 'leagues/l1/teams/t1'."""
+    
+    def __init__(self):
+        self.store = {}
+        self.commits = []
+        self._next_id = 0
+    
+    def new_id(self):
+        self._next_id += 1
+        return f'auto{self._next_id}'
+    
+    def collection(self, name):
+        return FakeCollection(self, name)
+    
+    def batch(self):
+        return FakeBatch(self)
+    
+    def get_all(self, refs):
+        return [ref.get() for ref in refs]
+
+
+_fake_db = FakeFirestore()
+_socketio = SocketIO()
+
+
+def _install_app_package():
+    """Register the app package without running its import-time setup."""
+    if 'app' in sys.modules:
+        return
+    
+    package = types.ModuleType('app')
+    package.__path__ = [str(APP_DIR)]
+    package.db = _fake_db
+    package.get_db = lambda: _fake_db
+    package.get_socketio = lambda: _socketio
+    sys.modules['app'] = package
+    
+    from app.utils.logger import get_logger
+    package.get_logger = get_logger
+    
+    # team_model.py still uses the old Team class and imports a helper the
+    # logger no longer has; the services only need the TeamModel name, and
+    # tests give each service its own team model.
+    team_model = types.ModuleType('app.models.team_model')
+    team_model.TeamModel = type('TeamModel', (), {})
+    sys.modules['app.models.team_model'] = team_model
+
+
+_install_app_package()
+
+
+@pytest.fixture
+def fake_db():
+    """A fresh in-memory Firestore shared with every model and service."""
+    _fake_db.store.clear()
+    _fake_db.commits.clear()
+    return _fake_db
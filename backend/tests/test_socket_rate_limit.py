@@ -0,0 +1,133 @@
+"""Tests for the per-user socket event rate limiter."""
+import pytest
+import redis
+from cachetools import TTLCache
+
+from app import socket_events
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+    
+    def set(self, key, value, ex=None, nx=False):
+        self._commands.append(('set', key, value, ex, nx))
+    
+    def incr(self, key):
+        self._commands.append(('incr', key))
+    
+    def execute(self):
+        if self._store.fail:
+            raise redis.ConnectionError('redis unavailable')
+        
+        results = []
+        for command in self._commands:
+            if command[0] == 'set':
+                _, key, value, ex, nx = command
+                if nx and key in self._store.values:
+                    results.append(None)
+                else:
+                    self._store.values[key] = value
+                    self._store.ttls[key] = ex
+                    results.append(True)
+            else:
+                key = command[1]
+                self._store.values[key] = self._store.values.get(key, 0) + 1
+                results.append(self._store.values[key])
+        self._commands = []
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.fail = False
+    
+    def pipeline(self):
+        return FakePipeline(self)
+    
+    def expire_all(self):
+        self.values.clear()
+        self.ttls.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(socket_events, 'presence_store', None)
+    monkeypatch.setattr(socket_events.time, 'monotonic', clock)
+    monkeypatch.setattr(socket_events, '_local_rate_windows',
+                        TTLCache(maxsize=10000, ttl=5, timer=clock))
+    return clock
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeRedis()
+    monkeypatch.setattr(socket_events, 'presence_store', store)
+    return store
+
+
+def allowed(count, user_id='u1', event='chat', limit=3, window=5):
+    return [socket_events._allow_event(user_id, event, limit, window) for _ in range(count)]
+
+
+def test_local_limit_blocks_after_limit(clock):
+    assert allowed(5) == [True, True, True, False, False]
+
+
+def test_local_window_resets(clock):
+    allowed(4)
+    clock.now += 4.9
+    assert allowed(1) == [False]
+    clock.now += 0.1
+    assert allowed(4) == [True, True, True, False]
+
+
+def test_local_limits_are_per_user_and_event(clock):
+    allowed(3)
+    assert allowed(1, user_id='u2') == [True]
+    assert allowed(1, event='draft_pick') == [True]
+    assert allowed(1) == [False]
+
+
+def test_local_idle_entries_expire(clock):
+    allowed(2, user_id='u1')
+    allowed(2, user_id='u2')
+    clock.now += 6
+    socket_events._local_rate_windows.expire()
+    assert len(socket_events._local_rate_windows) == 0
+
+
+def test_redis_limit_uses_shared_counter(store):
+    assert allowed(5) == [True, True, True, False, False]
+    assert store.values == {'rl:chat:u1': 5}
+    assert store.ttls == {'rl:chat:u1': 5}
+
+
+def test_redis_counter_keeps_first_expiry(store):
+    allowed(1, window=5)
+    store.ttls['rl:chat:u1'] = 2
+    allowed(1, window=5)
+    assert store.ttls['rl:chat:u1'] == 2
+
+
+def test_redis_window_resets_when_key_expires(store):
+    allowed(4)
+    store.expire_all()
+    assert allowed(1) == [True]
+
+
+def test_redis_error_allows_event(store):
+    store.fail = True
+    assert allowed(5) == [True] * 5
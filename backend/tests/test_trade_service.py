@@ -0,0 +1,197 @@
+"""Tests for trade validation and trade response notifications."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.trade_service import TradeService, TradeValidationError
+
+LEAGUE = 'l1'
+
+
+def make_team(team_id, players, owner_id=None):
+    players = list(players)
+    return {'id': team_id, 'owner_id': owner_id or f'owner_{team_id}',
+            'roster': {'starters': players[:11], 'bench': players[11:]}}
+
+
+class FakeTeamModel:
+    def __init__(self, teams):
+        self.teams = {team['id']: team for team in teams}
+        self.league_team_reads = 0
+    
+    def get_team(self, league_id, team_id):
+        return self.teams.get(team_id)
+    
+    def get_league_teams(self, league_id):
+        self.league_team_reads += 1
+        return list(self.teams.values())
+
+
+class FakeLeagueModel:
+    def __init__(self, league):
+        self.league = league
+    
+    def get_league(self, league_id):
+        return self.league
+
+
+class FakeTradeModel:
+    def __init__(self, trade):
+        self.trade = trade
+    
+    def _respond(self, league_id, trade_id, user_id):
+        return {'success': True, 'trade': self.trade}
+    
+    accept_trade = reject_trade = cancel_trade = _respond
+
+
+class FakeNotificationService:
+    async def send_trade_acceptance_notification(self, user_id, trade_id, league_id):
+        pass
+    
+    async def send_trade_rejection_notification(self, user_id, trade_id, reason, league_id):
+        pass
+    
+    async def send_trade_cancellation_notification(self, user_id, trade_id, league_id):
+        pass
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.tasks = []
+    
+    def start_background_task(self, target, *args, **kwargs):
+        self.tasks.append((target, args, kwargs))
+    
+    def emit(self, *args, **kwargs):
+        pass
+
+
+PROPOSER = make_team('p', range(1, 14))
+TARGET = make_team('t', range(101, 114))
+
+
+@pytest.fixture
+def service():
+    service = TradeService.__new__(TradeService)
+    service.socketio = FakeSocketIO()
+    service.team_model = FakeTeamModel([make_team('p', range(1, 14)), make_team('t', range(101, 114))])
+    service.league_model = FakeLeagueModel({'id': LEAGUE, 'settings': {}})
+    service.notification_service = FakeNotificationService()
+    return service
+
+
+def check(service, league, proposer_players=(1,), target_players=(101,),
+          proposer=PROPOSER, target=TARGET):
+    service._check_trade_invariants(league, dict(proposer), dict(target),
+                                    list(proposer_players), list(target_players))
+
+
+def test_valid_trade_passes(service):
+    check(service, {'settings': {}})
+
+
+@pytest.mark.parametrize('deadline', [
+    '2000-01-01T00:00:00',
+    '2000-01-01T00:00:00+05:00',
+    datetime(2000, 1, 1, tzinfo=timezone.utc),
+])
+def test_passed_deadline_rejected(service, deadline):
+    with pytest.raises(TradeValidationError, match='Trade deadline has passed'):
+        check(service, {'settings': {'trade_deadline': deadline}})
+
+
+@pytest.mark.parametrize('deadline', [
+    (datetime.utcnow() + timedelta(days=1)).isoformat(),
+    datetime.now(timezone.utc) + timedelta(days=1),
+])
+def test_future_deadline_allowed(service, deadline):
+    check(service, {'settings': {'trade_deadline': deadline}})
+
+
+@pytest.mark.parametrize('deadline', ['next tuesday', 12345])
+def test_invalid_deadline_rejected(service, deadline):
+    with pytest.raises(TradeValidationError, match='League trade deadline is invalid'):
+        check(service, {'id': LEAGUE, 'settings': {'trade_deadline': deadline}})
+
+
+def test_locked_transactions_rejected(service):
+    with pytest.raises(TradeValidationError, match='locked by commissioner'):
+        check(service, {'settings': {}, 'transactions_locked': True})
+
+
+def test_missing_team_rejected(service):
+    with pytest.raises(TradeValidationError, match='One or both teams not found'):
+        service._check_trade_invariants({'settings': {}}, None, dict(TARGET), [1], [101])
+
+
+def test_player_ownership_checked(service):
+    with pytest.raises(TradeValidationError, match='Proposer does not own player 101'):
+        check(service, {'settings': {}}, proposer_players=[101], target_players=[])
+    with pytest.raises(TradeValidationError, match='Target team does not own player 1'):
+        check(service, {'settings': {}}, proposer_players=[], target_players=[1])
+
+
+def test_roster_limits_checked(service):
+    with pytest.raises(TradeValidationError, match='Proposer roster would exceed maximum size'):
+        check(service, {'settings': {}}, proposer_players=[],
+              target_players=[101, 102, 103], target=make_team('t', range(101, 116)))
+    with pytest.raises(TradeValidationError, match='Proposer roster would be below minimum size'):
+        check(service, {'settings': {}}, proposer_players=[1, 2, 3], target_players=[],
+              target=make_team('t', range(101, 112)))
+
+
+def test_validate_trade_proposal_reports_reason(service):
+    assert service._validate_trade_proposal(LEAGUE, 'p', 'p', [1], [])['reason'] == 'Cannot trade with yourself'
+    assert service._validate_trade_proposal(LEAGUE, 'p', 't', [1], [101])['valid']
+    
+    service.league_model.league = {'id': LEAGUE, 'settings': {'trade_deadline': '2000-01-01'}}
+    result = service._validate_trade_proposal(LEAGUE, 'p', 't', [1], [101])
+    assert result == {'valid': False, 'reason': 'Trade deadline has passed'}
+
+
+RESPONSES = [
+    ('accept_trade', (), 'send_trade_acceptance_notification', 'proposer'),
+    ('reject_trade', ('too low',), 'send_trade_rejection_notification', 'proposer'),
+    ('cancel_trade', (), 'send_trade_cancellation_notification', 'receiver'),
+]
+
+
+def notified_user(service):
+    notifications = [args for target, args, _ in service.socketio.tasks
+                     if target == service._run_notification]
+    assert len(notifications) == 1
+    send, send_args = notifications[0]
+    return send.__name__, send_args[0]
+
+
+@pytest.mark.parametrize('method, extra, send_name, side', RESPONSES)
+def test_response_notifies_denormalized_owner(service, method, extra, send_name, side):
+    service.trade_model = FakeTradeModel({'proposer_team_id': 'p', 'receiver_team_id': 't',
+                                          f'{side}_owner_id': 'stored_owner'})
+    
+    result = getattr(service, method)(LEAGUE, 'tr1', 'user', *extra)
+    
+    assert result['success']
+    assert notified_user(service) == (send_name, 'stored_owner')
+    assert service.team_model.league_team_reads == 0
+
+
+@pytest.mark.parametrize('method, extra, send_name, side', RESPONSES)
+def test_response_falls_back_to_league_teams(service, method, extra, send_name, side):
+    # Trades written before owner IDs were denormalized only carry team IDs
+    service.trade_model = FakeTradeModel({'proposer_team_id': 'p', 'receiver_team_id': 't'})
+    
+    result = getattr(service, method)(LEAGUE, 'tr1', 'user', *extra)
+    
+    expected_owner = 'owner_p' if side == 'proposer' else 'owner_t'
+    assert result['success']
+    assert notified_user(service) == (send_name, expected_owner)
+    assert service.team_model.league_team_reads == 1
+
+
+def test_response_without_trade_skips_notification(service):
+    service.trade_model = FakeTradeModel(None)
+    
+    assert service.cancel_trade(LEAGUE, 'tr1', 'user')['success']
+    assert [target for target, _, _ in service.socketio.tasks] == [service.socketio.emit]
@@ -0,0 +1,192 @@
+"""Tests for waiver claim processing."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import waiver_service as waiver_module
+from app.services.waiver_service import WaiverService, _OperationCache, _claim_sort_key
+
+LEAGUE = 'l1'
+BASE_TIME = datetime(2024, 1, 1, 12, 0)
+
+
+class FakePlayerModel:
+    def __init__(self, drafted=()):
+        self.drafted = list(drafted)
+    
+    def _get_drafted_players(self, league_id):
+        return list(self.drafted)
+
+
+@pytest.fixture
+def service(fake_db, monkeypatch):
+    service = WaiverService.__new__(WaiverService)
+    service.db = fake_db
+    service.player_model = FakePlayerModel()
+    monkeypatch.setattr(service, '_acquire_waivers_lock', lambda league_ref: True, raising=False)
+    monkeypatch.setattr(service, '_release_waivers_lock', lambda league_ref: None, raising=False)
+    monkeypatch.setattr(waiver_module, '_enqueue_notification', lambda *args: None)
+    return service
+
+
+def add_league(db, order, teams_count=None):
+    db.store[f'leagues/{LEAGUE}'] = {
+        'waiver_order': list(order),
+        'teams_count': len(order) if teams_count is None else teams_count,
+    }
+
+
+def add_team(db, team_id, budget=100, bench=(), position=1):
+    db.store[f'leagues/{LEAGUE}/teams/{team_id}'] = {
+        'id': team_id,
+        'name': team_id.upper(),
+        'waiver_budget': budget,
+        'waiver_position': position,
+        'roster': {'starters': [], 'bench': list(bench)},
+    }
+
+
+def add_claim(db, claim_id, team_id, player_id, bid=0, priority=1, minutes=0, drop=None):
+    db.store[f'leagues/{LEAGUE}/waiver_claims/{claim_id}'] = {
+        'id': claim_id,
+        'team_id': team_id,
+        'player_id': player_id,
+        'drop_player_id': drop,
+        'bid_amount': bid,
+        'priority': priority,
+        'sort_key': _claim_sort_key(priority, bid),
+        'status': 'pending',
+        'claimed_at': BASE_TIME + timedelta(minutes=minutes),
+    }
+
+
+def statuses(result):
+    return {r['claim_id']: r['status'] for r in result['results']}
+
+
+def test_best_ranked_claim_wins_each_player(fake_db, service):
+    add_league(fake_db, ['a', 'b'])
+    add_team(fake_db, 'a', position=1)
+    add_team(fake_db, 'b', position=2)
+    # Same priority: the higher bid wins
+    add_claim(fake_db, 'c1', 'a', 10, bid=5, priority=1)
+    add_claim(fake_db, 'c2', 'b', 10, bid=9, priority=1, minutes=1)
+    # Different priority: the better priority wins regardless of bid
+    add_claim(fake_db, 'c3', 'a', 11, bid=1, priority=1, minutes=2)
+    add_claim(fake_db, 'c4', 'b', 11, bid=50, priority=2)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert result['success']
+    assert statuses(result) == {'c1': 'failed', 'c2': 'successful',
+                                'c3': 'successful', 'c4': 'failed'}
+    assert fake_db.store[f'leagues/{LEAGUE}/waiver_claims/c2']['status'] == 'successful'
+    assert fake_db.store[f'leagues/{LEAGUE}/waiver_claims/c1']['status'] == 'failed'
+
+
+def test_earlier_claim_wins_a_tie(fake_db, service):
+    add_league(fake_db, ['a', 'b'])
+    add_team(fake_db, 'a')
+    add_team(fake_db, 'b')
+    add_claim(fake_db, 'late', 'a', 10, bid=5, minutes=5)
+    add_claim(fake_db, 'early', 'b', 10, bid=5, minutes=1)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert statuses(result) == {'early': 'successful', 'late': 'failed'}
+
+
+def test_running_budget_spans_claims_in_one_run(fake_db, service):
+    add_league(fake_db, ['a', 'b'])
+    add_team(fake_db, 'a', budget=10)
+    add_team(fake_db, 'b', budget=100)
+    add_claim(fake_db, 'a1', 'a', 10, bid=8)
+    # Team a has 2 left after winning player 10, so it loses player 11
+    # to team b's lower bid
+    add_claim(fake_db, 'a2', 'a', 11, bid=5)
+    add_claim(fake_db, 'b1', 'b', 11, bid=3, priority=2)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert statuses(result) == {'a1': 'successful', 'a2': 'failed', 'b1': 'successful'}
+
+
+def test_rostered_player_and_missing_drop_fail(fake_db, service):
+    add_league(fake_db, ['a'])
+    add_team(fake_db, 'a', bench=[1])
+    service.player_model = FakePlayerModel(drafted=[99])
+    add_claim(fake_db, 'taken', 'a', 99)
+    add_claim(fake_db, 'bad_drop', 'a', 10, drop=2)
+    add_claim(fake_db, 'good_drop', 'a', 11, drop=1)
+    # Player 1 was dropped by the claim above, so it is no longer on the roster
+    add_claim(fake_db, 'dropped_twice', 'a', 12, drop=1)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert statuses(result) == {'taken': 'failed', 'bad_drop': 'failed',
+                                'good_drop': 'successful', 'dropped_twice': 'failed'}
+
+
+def test_successful_teams_move_to_end_of_waiver_order(fake_db, service):
+    add_league(fake_db, ['a', 'b', 'c', 'd'])
+    for position, team_id in enumerate('abcd', start=1):
+        add_team(fake_db, team_id, position=position)
+    add_claim(fake_db, 'a1', 'a', 10)
+    add_claim(fake_db, 'c1', 'c', 11)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert result['success']
+    assert fake_db.store[f'leagues/{LEAGUE}']['waiver_order'] == ['b', 'd', 'a', 'c']
+    positions = {team_id: fake_db.store[f'leagues/{LEAGUE}/teams/{team_id}']['waiver_position']
+                 for team_id in 'abcd'}
+    assert positions == {'b': 1, 'd': 2, 'a': 3, 'c': 4}
+
+
+def test_waiver_order_unchanged_when_no_claim_succeeds(fake_db, service):
+    add_league(fake_db, ['a', 'b'])
+    add_team(fake_db, 'a', budget=0)
+    add_team(fake_db, 'b')
+    add_claim(fake_db, 'a1', 'a', 10, bid=5)
+    
+    service.process_waivers(LEAGUE)
+    
+    assert fake_db.store[f'leagues/{LEAGUE}']['waiver_order'] == ['a', 'b']
+
+
+def test_batches_are_split_under_write_limit(fake_db, service, monkeypatch):
+    monkeypatch.setattr(waiver_module, 'WAIVER_BATCH_WRITE_LIMIT', 3)
+    add_league(fake_db, ['a', 'b'])
+    add_team(fake_db, 'a')
+    add_team(fake_db, 'b')
+    for player_id in range(5):
+        add_claim(fake_db, f'b{player_id}', 'b', player_id, priority=2)
+    
+    result = service.process_waivers(LEAGUE)
+    
+    assert len(result['results']) == 5
+    assert len(fake_db.commits) > 1
+    assert fake_db.store[f'leagues/{LEAGUE}']['waiver_order'] == ['a', 'b']
+
+
+def test_waiver_order_backfilled_when_short(fake_db, service):
+    add_league(fake_db, ['b'], teams_count=3)
+    add_team(fake_db, 'a', position=2)
+    add_team(fake_db, 'b', position=3)
+    add_team(fake_db, 'c', position=1)
+    
+    order = service._get_waiver_order(LEAGUE, _OperationCache())
+    
+    assert order == ['c', 'a', 'b']
+    assert fake_db.store[f'leagues/{LEAGUE}']['waiver_order'] == ['c', 'a', 'b']
+
+
+def test_complete_waiver_order_skips_team_scan(fake_db, service, monkeypatch):
+    add_league(fake_db, ['b', 'a'])
+    
+    def fail(league_id):
+        raise AssertionError('teams should not be scanned')
+    
+    monkeypatch.setattr(service, '_teams_collection', fail)
+    
+    assert service._get_waiver_order(LEAGUE, _OperationCache()) == ['b', 'a']
@@ -2,6 +2,7 @@
  * Socket.IO service for real-time communication with the backend.
  */
 import io, { Socket } from 'socket.io-client';
+import msgpackParser from 'socket.io-msgpack-parser';
 import { SocketEvents } from '../types';
 
 class SocketService {
@@ -30,6 +31,7 @@ class SocketService {
           token: authToken
         },
         transports: ['websocket', 'polling'],
+        parser: msgpackParser,
         timeout: 10000,
         reconnection: true,
         reconnectionAttempts: 5,
@@ -108,11 +110,20 @@ class SocketService {
       this.emit('chat_message', data);
     });
 
+    // Messages sent close together arrive as one batch
+    this.socket.on('chat_batch', (messages: any[]) => {
+      messages.forEach((data) => this.emit('chat_message', data));
+    });
+
     // Trade events
     this.socket.on('trade_proposed', (data) => {
       this.emit('trade_proposed', data);
     });
 
+    this.socket.on('trading_block_updated', (data) => {
+      this.emit('trading_block_updated', data);
+    });
+
     // Waiver events
     this.socket.on('waiver_claim_made', (data) => {
       this.emit('waiver_claim_made', data);
@@ -143,6 +154,18 @@ class SocketService {
     }
   }
 
+  joinTradingBlocks(leagueId: string): void {
+    if (this.socket && this.connected) {
+      this.socket.emit('join_trading_blocks', { league_id: leagueId });
+    }
+  }
+
+  leaveTradingBlocks(leagueId: string): void {
+    if (this.socket && this.connected) {
+      this.socket.emit('leave_trading_blocks', { league_id: leagueId });
+    }
+  }
+
   makeDraftPick(leagueId: string, playerId: number, pickNumber: number): void {
     if (this.socket && this.connected) {
       this.socket.emit('draft_pick', {
@@ -257,6 +280,10 @@ class SocketService {
     this.on('trade_proposed', handler);
   }
 
+  onTradingBlockUpdated(handler: (data: { league_id: string; team_id: string }) => void): void {
+    this.on('trading_block_updated', handler);
+  }
+
   onWaiverClaimMade(handler: (data: any) => void): void {
     this.on('waiver_claim_made', handler);
   }
@@ -294,6 +321,10 @@ class SocketService {
     this.off('trade_proposed', handler);
   }
 
+  offTradingBlockUpdated(handler?: Function): void {
+    this.off('trading_block_updated', handler);
+  }
+
   offWaiverClaimMade(handler?: Function): void {
     this.off('waiver_claim_made', handler);
   }
@@ -418,8 +418,11 @@ export interface SocketEvents {
   
   // Trade events
   trade_proposal: (data: { league_id: string; to_team_id: string }) => void;
-  trade_proposed: (data: Trade) => void;
+  trade_proposed: (data: { league_id: string; trade_id: string }) => void;
   trade_updated: (data: Trade) => void;
+  join_trading_blocks: (data: { league_id: string }) => void;
+  leave_trading_blocks: (data: { league_id: string }) => void;
+  trading_block_updated: (data: { league_id: string; team_id: string }) => void;
   
   // Waiver events
   waiver_claim: (data: { league_id: string; player_id: number; bid_amount: number }) => void;
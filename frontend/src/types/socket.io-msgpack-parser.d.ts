@@ -0,0 +1 @@
+declare module 'socket.io-msgpack-parser';